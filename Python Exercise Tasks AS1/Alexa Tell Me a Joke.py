@@ -1,18 +1,39 @@
+import startup  # first, so the startup clock includes the other imports
 import tkinter as tk
 from pathlib import Path
 import random
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+
+import metrics
+from background_loader import BackgroundLoader
+from backgrounds import draw_background
+from file_watcher import FileWatcher, capture
+from joke_corpus import JokeCorpus, build_shard, iter_corpus, joke_hash, load_corpus, scan_shard
+from joke_index import LazyShuffle, MemoryJokes
+from joke_reactions import BOO, LAUGH, MEH, FenwickSampler, ReactionStore
+from typewriter import Typewriter
 
 # -----------------------------
 # Paths and defaults
 # -----------------------------
 JOKES_PATH = Path(__file__).parent / "Assets" / "randomJokes.txt"
+# More joke shards: a directory (or a glob pattern) of .txt / .txt.gz files.
+# Missing sources are skipped; duplicate jokes across files are dropped.
+JOKES_DIR = Path(__file__).parent / "Assets" / "jokes"
 
 DEFAULT_JOKES = [
     ("Why did the chicken cross the road", "To get to the other side"),
     ("What do you call fake spaghetti", "An impasta"),
 ]
 
+# Pick jokes with weights from their reactions: 😂 makes a joke come up more
+# often, 👎 less (see joke_reactions.py). Reactions are saved between runs.
+WEIGHTED = True
+# When not weighted: go through every joke once before repeating any
+# (False = plain random picks)
+NO_REPEAT = True
+
+REACTION_KINDS = {"😂": LAUGH, "😐": MEH, "👎": BOO}
+
 # -----------------------------
 # Joke App
 # -----------------------------
@@ -24,21 +45,37 @@ class JokeApp:
         self.width, self.height = 400, 220
         root.geometry(f"{self.width}x{self.height}")
 
-        # Canvas background
-        self.canvas = tk.Canvas(root, width=self.width, height=self.height, highlightthickness=0)
+        # Only the plain widgets are built before the first paint; the rest
+        # is deferred until the window is up (see startup.py)
+        self.startup = startup.Startup(root)
+
+        # Canvas background (flat blue until the gradient is drawn)
+        self.canvas = tk.Canvas(root, width=self.width, height=self.height,
+                                highlightthickness=0, bg="#4A00E0")
         self.canvas.pack(fill="both", expand=True)
 
-        # Neon gradient background
-        self.bg_photo = ImageTk.PhotoImage(self._make_background(self.width, self.height))
-        self.canvas.create_image(0, 0, image=self.bg_photo, anchor="nw")
+        # Neon gradient background (blue -> purple), one cached image item
+        self.startup.defer("background", lambda: draw_background(
+            self.canvas, self.width, self.height, ((74, 0, 224), (142, 45, 255))))
 
         # Frame on top for UI controls
         self.frame = tk.Frame(self.canvas, bg="#000000", bd=0)
         self.canvas.create_window(self.width//2, self.height//2, window=self.frame)
 
-        # Load jokes
-        self.jokes = self._load_jokes()
+        # Jokes load in the background, shard by shard; the corpus grows (and
+        # the shuffle with it) as each shard finishes
+        self.jokes = JokeCorpus()
+        self.shuffle = LazyShuffle(0)
+        self.reactions = ReactionStore()
+        self.sampler = FenwickSampler()
+        # Hashes of the jokes loaded, so jokes appended later are deduplicated too
+        self.seen = set()
+        self.loader = None
+        # Picks up edits to randomJokes.txt while the app runs (see Live reload)
+        self.watcher = FileWatcher(root, self._jokes_appended, self._jokes_rewritten)
+        self.refresher = None
         self.current = None
+        self.current_index = None
         self.jokes_told = 0
         self.reacts = {"😂": 0, "😐": 0, "👎": 0}
 
@@ -47,6 +84,7 @@ class JokeApp:
                               wraplength=360, justify="center",
                               font=("Arial", 12, "bold"), fg="#00ffff", bg="#000000")
         self.label.pack(pady=(10,5))
+        self.typewriter = Typewriter(self.label)
 
         # Controls
         controls = tk.Frame(self.frame, bg="#000000")
@@ -70,48 +108,170 @@ class JokeApp:
         # Bind Enter
         root.bind("<Return>", lambda e: self.toggle_joke())
 
-    # -----------------------------
-    # Background generator
-    # -----------------------------
-    def _make_background(self, w, h):
-        img = Image.new("RGB", (w, h), "#000000")
-        draw = ImageDraw.Draw(img)
-        # Neon gradient (blue -> purple)
-        for y in range(h):
-            t = y / max(1, h-1)
-            r = int(74 + (142-74)*t)
-            g = int(0 + (45-0)*t)
-            b = int(224 + (255-224)*t)
-            draw.line([(0,y),(w,y)], fill=(r,g,b))
-        return img
+        self.startup.defer("jokes", self._start_loading)
 
     # -----------------------------
     # Load jokes
     # -----------------------------
+    def _sources(self):
+        return [JOKES_PATH, JOKES_DIR]
+
     def _load_jokes(self):
-        if JOKES_PATH.exists():
-            out = []
-            try:
-                with JOKES_PATH.open(encoding="utf-8") as f:
-                    for line in f:
-                        if "?" in line:
-                            s, p = line.strip().split("?", 1)
-                            out.append((s.strip(), p.strip()))
-            except Exception:
-                return DEFAULT_JOKES.copy()
-            return out or DEFAULT_JOKES.copy()
-        return DEFAULT_JOKES.copy()
+        # Synchronous load of every shard (the window uses _start_loading)
+        with metrics.timer("jokes.load", mode="sync") as t:
+            jokes = load_corpus(self._sources())
+            if not jokes:
+                jokes = MemoryJokes(DEFAULT_JOKES)
+            t.set(jokes=len(jokes))
+        return jokes
+
+    def _start_loading(self):
+        self._load_timer = metrics.timer("jokes.load", mode="background")
+        self._file_state = capture(JOKES_PATH)
+        self.loader = BackgroundLoader(
+            self.root,
+            self._produce_shards,
+            self._add_shard,
+            on_done=self._jokes_loaded,
+            on_error=lambda exc: self._jokes_loaded(),
+        )
+        self.loader.start()
+
+    def _produce_shards(self, seen=None):
+        # Worker thread: alongside each shard, prepare its block of sampler
+        # weights and find the jokes in it that already have reactions, so
+        # adding the shard on the main thread stays cheap
+        base = 0
+        for shard, progress in iter_corpus(self._sources(), seen=self.seen if seen is None else seen):
+            if shard is None:
+                yield None, progress
+                continue
+            block = FenwickSampler.uniform_block(base, len(shard))
+            weights = self.reactions.weights_for(shard.hashes, base)
+            base += len(shard)
+            yield (shard, block, weights), progress
+
+    def _add_shard(self, item):
+        if item is None:
+            return
+        self._extend(self.jokes, self.shuffle, self.sampler, *item)
+
+    @staticmethod
+    def _extend(jokes, shuffle, sampler, shard, block, weights):
+        jokes.add(shard)
+        shuffle.grow(len(jokes))
+        sampler.extend_ones(len(shard), block)
+        for i, weight in weights:
+            sampler.update(i, weight)
+
+    def _default_shard(self):
+        hashes = [joke_hash(*joke) for joke in DEFAULT_JOKES]
+        return MemoryJokes(DEFAULT_JOKES, hashes), None, self.reactions.weights_for(hashes)
+
+    def _jokes_loaded(self):
+        if not self.jokes:
+            self._add_shard(self._default_shard())
+        self._load_timer.stop(jokes=len(self.jokes), shards=len(self.jokes.shards))
+        self.watcher.watch(JOKES_PATH, self._file_state)
+
+    # -----------------------------
+    # Live reload
+    # -----------------------------
+    # Jokes appended to randomJokes.txt are scanned on a worker thread and
+    # added as one more shard, so indices (and the shuffle and weights) of the
+    # jokes already loaded don't move. Any other change re-reads every source
+    # in the background into a new corpus that replaces the old one at once.
+    def _refreshing(self):
+        return self.refresher is not None and not self.refresher.finished
+
+    def _jokes_appended(self, old_size):
+        if self._refreshing():
+            self.watcher.retry()
+            return
+        timer = metrics.timer("jokes.reload", mode="append")
+        self.refresher = BackgroundLoader(
+            self.root,
+            lambda: self._produce_tail(old_size),
+            self._add_shard,
+            on_done=lambda: timer.stop(jokes=len(self.jokes)),
+            on_error=lambda exc: timer.stop(error=type(exc).__name__),
+        )
+        self.refresher.start()
+
+    def _produce_tail(self, start):
+        # Worker thread: the appended jokes not seen before, ready to add
+        shard = build_shard(scan_shard(JOKES_PATH, start), self.seen)
+        if shard is None:
+            return
+        base = len(self.jokes)
+        block = FenwickSampler.uniform_block(base, len(shard))
+        yield (shard, block, self.reactions.weights_for(shard.hashes, base)), None
+
+    def _jokes_rewritten(self):
+        if self._refreshing():
+            self.watcher.retry()
+            return
+        self.refresher = BackgroundLoader(
+            self.root,
+            self._rebuild_jokes,
+            self._swap_jokes,
+            on_error=lambda exc: metrics.event("jokes.reload_failed", error=str(exc)),
+        )
+        self.refresher.start()
+
+    def _rebuild_jokes(self):
+        # Worker thread: nothing here is on screen until _swap_jokes
+        with metrics.timer("jokes.reload", mode="rewrite") as t:
+            seen = set()
+            jokes, shuffle, sampler = JokeCorpus(), LazyShuffle(0), FenwickSampler()
+            for item, _ in self._produce_shards(seen):
+                if item is not None:
+                    self._extend(jokes, shuffle, sampler, *item)
+            if not jokes:
+                self._extend(jokes, shuffle, sampler, *self._default_shard())
+            t.set(jokes=len(jokes))
+        yield (jokes, shuffle, sampler, seen), None
+
+    def _swap_jokes(self, item):
+        old = self.jokes
+        self.jokes, self.shuffle, self.sampler, self.seen = item
+        # The joke on screen keeps its text but no longer has an index
+        self.current_index = None
+        old.close()
+
+    def _draw_joke(self):
+        if WEIGHTED:
+            i = self.sampler.sample()
+            # Avoid the same joke twice in a row when there is a choice
+            if i == self.current_index and len(self.jokes) > 1:
+                i = self.sampler.sample()
+        elif NO_REPEAT:
+            i = self.shuffle.draw()
+        else:
+            i = random.randrange(len(self.jokes))
+        self.current_index = i
+        return self.jokes.get(i)
 
     # -----------------------------
     # Toggle joke display
     # -----------------------------
     def toggle_joke(self):
         if not self.jokes:
-            self.label.config(text=f"No jokes found.\nCheck the file path.")
+            if self.loader is None or not self.loader.finished:
+                self.label.config(text="Loading jokes…")
+            else:
+                self.label.config(text=f"No jokes found.\nCheck the file path.")
             return
         if self.btn.cget("text") in ("Tell Me a Joke", "Tell Another"):
-            self.current = random.choice(self.jokes)
+            try:
+                self.current = self._draw_joke()
+            except IndexError:
+                # The joke file was cut short under the old index; the reload
+                # replacing it is already on its way
+                self.label.config(text="Reloading jokes…")
+                return
             self._typewriter(self.current[0] + "?")
+            self.reactions_label.config(text=self._reaction_text())
             self.btn.config(text="Show Punchline")
         else:
             self._typewriter(f"{self.current[0]}?\n\n{self.current[1]}")
@@ -124,24 +284,27 @@ class JokeApp:
     # -----------------------------
     def react(self, key):
         self.reacts[key] += 1
+        if self.current_index is not None:
+            # Saved against the joke on screen, and its selection weight updated
+            h = self.jokes.hash(self.current_index)
+            self.reactions.add(h, REACTION_KINDS[key])
+            self.sampler.update(self.current_index, self.reactions.weight(h))
         self.reactions_label.config(text=self._reaction_text())
 
     def _reaction_text(self):
-        return "   ".join(f"{k} {v}" for k,v in self.reacts.items())
+        # Reactions to the joke on screen (all time), or this session's before any joke
+        if self.current_index is None:
+            return "   ".join(f"{k} {v}" for k,v in self.reacts.items())
+        counts = self.reactions.get(self.jokes.hash(self.current_index))
+        return "   ".join(f"{k} {counts[kind]}" for k, kind in REACTION_KINDS.items())
 
     # -----------------------------
     # Typewriter effect
     # -----------------------------
     def _typewriter(self, text, delay=25):
-        self.label.config(text="")
-        self._chars = text
-        self._pos = 0
-        def step():
-            if self._pos < len(self._chars):
-                self.label.config(text=self.label.cget("text")+self._chars[self._pos])
-                self._pos +=1
-                self.root.after(delay, step)
-        step()
+        # delay: ms per character; frames are grouped and any animation still
+        # running is cancelled (see typewriter.py)
+        self.typewriter.start(text, chars_per_sec=1000 / delay)
 
 # -----------------------------
 # Main
@@ -149,4 +312,7 @@ class JokeApp:
 if __name__ == "__main__":
     root = tk.Tk()
     app = JokeApp(root)
+    metrics.watch(root)
     root.mainloop()
+    app.watcher.stop()
+    app.reactions.close()
@@ -1,7 +1,16 @@
+import startup  # first, so the startup clock includes the other imports
 import tkinter as tk
-from tkinter import messagebox, ttk
-import random
+from tkinter import ttk
 import math
+import sqlite3
+
+import metrics
+import quiz_engine
+from quiz_engine import CORRECT, RETRY, QuizEngine
+from quiz_stats import QuizStats, SessionLog
+from question_pool import TIERS
+from quiz_timer import CountdownTimer
+from toast import Toast
 
 # -----------------------------
 # Styling / Constants
@@ -16,27 +25,34 @@ FONT_MAIN = ("Poppins", 16)
 FONT_TITLE = ("Poppins", 20, "bold")
 FONT_BTN = ("Poppins", 12, "bold")
 
-QUESTIONS_TOTAL = 10
+QUESTIONS_TOTAL = quiz_engine.QUESTIONS_TOTAL
 
 
 class QuizApp:
     def __init__(self):
-        # Quiz state
-        self.difficulty = 1
-        self.score = 0
-        self.question_number = 0
-        self.first_attempt = True
-        self.num1 = 0
-        self.num2 = 0
-        self.operation = "+"
+        # Quiz state lives in the headless engine; this class only drives the UI
+        self.engine = QuizEngine(questions_total=QUESTIONS_TOTAL)
+        # Every attempt is logged; the aggregate store is caught up after each quiz
+        self.session_log = SessionLog()
+        self.stats = None
         self.answer_entry = None
         self.current_progress = None
 
+        # Screens are built once and then reused; only their text changes
+        self.active_view = None
+        self.menu_view = None
+        self.question_view = None
+        self.results_view = None
+        self.question_count_label = None
+        self.problem_label = None
+        self.score_label = None
+        self.grade_label = None
+        self.best_label = None
+
         # Timer / animation state
         self.timer_seconds = 0
         self.timer_total = 1.0
         self.timer_remaining = 0.0
-        self.timer_job = None
         self.timer_label = None
         self.timer_canvas = None
         self.timer_arc = None
@@ -47,6 +63,8 @@ class QuizApp:
         self.window.geometry("500x550")
         self.window.resizable(False, False)
         self.window.config(bg=BG_COLOR)
+        # Reports time to first paint (see startup.py); nothing here is deferred
+        self.startup = startup.Startup(self.window)
 
         style = ttk.Style()
         style.theme_use("clam")
@@ -71,13 +89,19 @@ class QuizApp:
         )
         self.timer_label.place(relx=0.88, rely=0.04, anchor="center")
 
+        # Deadline-based countdown (see quiz_timer.py)
+        self.timer = CountdownTimer(self.window, self.timer_tick, self.on_timeout)
+
+        # Answer feedback as a self-hiding banner, so the quiz never waits on a dialog
+        self.toast = Toast(self.window)
+
         # Global Enter binding
         self.window.bind("<Return>", self.check_answer)
 
     # ---------- UI helpers ----------
-    def make_button(self, text, command):
+    def make_button(self, text, command, parent=None):
         btn = tk.Button(
-            self.frame,
+            parent or self.frame,
             text=text,
             font=FONT_BTN,
             fg="white",
@@ -92,13 +116,18 @@ class QuizApp:
         btn.pack(pady=8)
         return btn
 
-    def clear_frame(self):
-        for widget in self.frame.winfo_children():
-            widget.destroy()
+    def show_view(self, view):
+        # Swap which screen is packed in the card; nothing is destroyed
+        if self.active_view is view:
+            return
+        if self.active_view is not None:
+            self.active_view.pack_forget()
+        view.pack(fill="both", expand=True)
+        self.active_view = view
 
-    def create_header(self, title_text):
+    def create_header(self, title_text, parent=None):
         tk.Label(
-            self.frame,
+            parent or self.frame,
             text=title_text,
             font=("Poppins", 22, "bold"),
             fg="#00FFFF",
@@ -113,11 +142,10 @@ class QuizApp:
     # The arc shrinks clockwise to indicate remaining time visually.
     # This was helped made by AI assistance.
     def create_timer_canvas(self):
+        # Created once; later questions just reset the arc
         if self.timer_canvas:
-            try:
-                self.timer_canvas.destroy()
-            except Exception:
-                pass
+            self.timer_canvas.itemconfig(self.timer_arc, extent=359.9)
+            return
 
         self.timer_canvas = tk.Canvas(
             self.window, width=60, height=60, bg=BG_COLOR, highlightthickness=0
@@ -137,12 +165,7 @@ class QuizApp:
         self.create_timer_canvas()
 
     def timer_cancel(self):
-        if self.timer_job:
-            try:
-                self.window.after_cancel(self.timer_job)
-            except Exception:
-                pass
-        self.timer_job = None
+        self.timer.cancel()
 
     def timer_start(self):
         self.timer_cancel()
@@ -154,200 +177,248 @@ class QuizApp:
             self.on_timeout()
             return
 
-        def animate():
-            self.timer_remaining -= 0.05
-            if self.timer_remaining < 0:
-                self.timer_remaining = 0.0
+        self.timer.start(self.timer_total)
 
-            if self.timer_label:
-                self.timer_label.config(text=f"Time: {max(0, math.ceil(self.timer_remaining))}s")
+    def timer_tick(self, remaining, fraction):
+        # Called by the timer engine whenever the display needs to change
+        self.timer_remaining = remaining
+        if self.timer_label:
+            self.timer_label.config(text=f"Time: {max(0, math.ceil(remaining))}s")
 
-            if self.timer_canvas and self.timer_arc is not None:
-                fraction = self.timer_remaining / self.timer_total if self.timer_total > 0 else 0
-                extent = max(0, 360 * fraction)
-                try:
-                    # negative extent to animate clockwise shrinking
-                    self.timer_canvas.itemconfig(self.timer_arc, extent=-extent)
-                except Exception:
-                    pass
+        if self.timer_canvas and self.timer_arc is not None:
+            extent = max(0, 360 * fraction)
+            try:
+                # negative extent to animate clockwise shrinking
+                self.timer_canvas.itemconfig(self.timer_arc, extent=-extent)
+            except Exception:
+                pass
 
-            if self.timer_remaining <= 0:
-                self.timer_job = None
-                self.on_timeout()
-                return
+    def notify(self, message, kind="info"):
+        self.toast.show(message, kind)
 
-            self.timer_job = self.window.after(50, animate)
+    def attempt_latency_ms(self):
+        # Time on the countdown so far
+        return (self.timer.total - self.timer.remaining()) * 1000
 
-        animate()
+    def log_attempt(self, answer, attempt, latency_ms, outcome, points):
+        e = self.engine
+        try:
+            self.session_log.record_attempt(e.question_number, e.num1, e.operation, e.num2,
+                                            answer, attempt, latency_ms, outcome, points)
+        except OSError:
+            pass  # logging must never interrupt the quiz
 
     def on_timeout(self):
+        attempt = 1 if self.engine.first_attempt else 2
+        latency = self.timer_total * 1000
         self.timer_cancel()
-        if self.first_attempt:
-            self.first_attempt = False
-            messagebox.showwarning("Time's up", "Time's up! One more try.")
+        outcome = self.engine.timeout()
+        self.log_attempt(None, attempt, latency, outcome, 0)
+        if outcome == RETRY:
+            self.notify("Time's up! One more try.", "warning")
             if self.answer_entry:
                 self.answer_entry.delete(0, tk.END)
                 self.answer_entry.focus()
-            secs = {1: 10, 2: 20, 3: 30}.get(self.difficulty, 10)
-            self.timer_set(secs)
+            self.timer_set(self.engine.time_limit())
             self.timer_start()
         else:
-            messagebox.showinfo("Time's up", "Time's up! Moving to the next question.")
+            self.notify("Time's up! Moving to the next question.", "error")
             self.timer_cancel()
             self.next_question()
 
     # ---------- Quiz logic ----------
     def display_menu(self):
-        self.clear_frame()
-        self.create_header("🧮 MATHS QUIZ 🧠")
-        tk.Label(
-            self.frame,
-            text="Select Difficulty Level",
-            font=FONT_TITLE,
-            fg=TEXT_COLOR,
-            bg=CARD_COLOR,
-        ).pack(pady=20)
-
-        self.make_button("1. Easy (Single-digit)", lambda: self.start_quiz(1))
-        self.make_button("2. Moderate (Double-digit)", lambda: self.start_quiz(2))
-        self.make_button("3. Advanced (Four-digit)", lambda: self.start_quiz(3))
+        if self.menu_view is None:
+            self.menu_view = tk.Frame(self.frame, bg=CARD_COLOR)
+            self.create_header("🧮 MATHS QUIZ 🧠", self.menu_view)
+            tk.Label(
+                self.menu_view,
+                text="Select Difficulty Level",
+                font=FONT_TITLE,
+                fg=TEXT_COLOR,
+                bg=CARD_COLOR,
+            ).pack(pady=20)
+
+            # One button per difficulty tier (question_pool.TIERS)
+            for level, tier in TIERS.items():
+                self.make_button(f"{level}. {tier.label}", lambda l=level: self.start_quiz(l), self.menu_view)
+        self.show_view(self.menu_view)
 
     @staticmethod
     def random_int(difficulty_level):
-        if difficulty_level == 1:
-            return random.randint(1, 9), random.randint(1, 9)
-        if difficulty_level == 2:
-            return random.randint(10, 99), random.randint(10, 99)
-        return random.randint(1000, 9999), random.randint(1000, 9999)
+        return quiz_engine.random_int(difficulty_level)
 
     @staticmethod
     def decide_operation():
-        return random.choice(["+", "-"])
+        return quiz_engine.decide_operation()
 
     def start_quiz(self, level):
-        self.difficulty = level
-        self.score = 0
-        self.question_number = 0
-        self.first_attempt = True
+        self.engine.start(level)
+        self.session_log.start_session(level)
         self.next_question()
 
     def next_question(self):
+        with metrics.timer("quiz.question_transition", difficulty=self.engine.difficulty):
+            self.show_next_question()
+
+    def show_next_question(self):
         self.timer_cancel()
 
-        if self.question_number >= QUESTIONS_TOTAL:
+        progress_value = int((self.engine.question_number / QUESTIONS_TOTAL) * 100)
+        question = self.engine.next_question()
+        if question is None:
             self.display_results()
             return
+        num1, operation, num2 = question
+
+        if self.question_view is None:
+            self.build_question_view()
+        self.show_view(self.question_view)
 
-        self.clear_frame()
-        self.create_header("🧮 MATHS QUIZ 🧠")
+        self.current_progress["value"] = progress_value
 
-        progress = ttk.Progressbar(self.frame, orient="horizontal", length=300, mode="determinate")
-        progress["value"] = int((self.question_number / QUESTIONS_TOTAL) * 100)
-        progress["maximum"] = 100
-        progress.pack(pady=10)
-        self.current_progress = progress
+        # Same widgets every question: only their text changes
+        self.question_count_label.config(text=f"Question {self.engine.question_number} of {QUESTIONS_TOTAL}")
+        self.problem_label.config(text=f"{num1} {operation} {num2} =")
+        self.answer_entry.delete(0, tk.END)
+        self.answer_entry.focus()
 
-        self.first_attempt = True
-        self.question_number += 1
-        self.num1, self.num2 = self.random_int(self.difficulty)
-        self.operation = self.decide_operation()
+        self.timer_set(self.engine.time_limit())
+        self.timer_start()
 
-        tk.Label(
-            self.frame,
-            text=f"Question {self.question_number} of {QUESTIONS_TOTAL}",
+    def build_question_view(self):
+        # Built on the first question only; Enter is handled by the window binding
+        view = tk.Frame(self.frame, bg=CARD_COLOR)
+        self.create_header("🧮 MATHS QUIZ 🧠", view)
+
+        self.current_progress = ttk.Progressbar(view, orient="horizontal", length=300, mode="determinate")
+        self.current_progress["maximum"] = 100
+        self.current_progress.pack(pady=10)
+
+        self.question_count_label = tk.Label(
+            view,
+            text="",
             font=("Poppins", 14),
             fg="#BBBBBB",
             bg=CARD_COLOR,
-        ).pack(pady=10)
+        )
+        self.question_count_label.pack(pady=10)
 
-        tk.Label(
-            self.frame,
-            text=f"{self.num1} {self.operation} {self.num2} =",
+        self.problem_label = tk.Label(
+            view,
+            text="",
             font=("Poppins", 24, "bold"),
             fg="#FFD700",
             bg=CARD_COLOR,
-        ).pack(pady=20)
+        )
+        self.problem_label.pack(pady=20)
 
-        self.answer_entry = tk.Entry(self.frame, font=("Poppins", 18), justify="center", width=10)
+        self.answer_entry = tk.Entry(view, font=("Poppins", 18), justify="center", width=10)
         self.answer_entry.pack(pady=10)
-        self.answer_entry.focus()
-        self.answer_entry.bind("<Return>", self.check_answer)
 
-        self.make_button("Submit Answer", self.check_answer)
-
-        secs = {1: 10, 2: 20, 3: 30}.get(self.difficulty, 10)
-        self.timer_set(secs)
-        self.timer_start()
+        self.make_button("Submit Answer", self.check_answer, view)
+        self.question_view = view
 
     def is_correct(self, user_answer):
-        return user_answer == (self.num1 + self.num2 if self.operation == "+" else self.num1 - self.num2)
+        return self.engine.is_correct(user_answer)
 
     def check_answer(self, event=None):
-        if self.answer_entry is None:
+        if self.question_view is None or self.active_view is not self.question_view:
             return
 
         try:
             user_answer = int(self.answer_entry.get())
         except ValueError:
-            messagebox.showwarning("Invalid Input", "Please enter a number.")
+            self.notify("Please enter a number.", "warning")
             return
 
         progress = self.current_progress
+        attempt = 1 if self.engine.first_attempt else 2
+        latency = self.attempt_latency_ms()
+        outcome, points = self.engine.submit(user_answer)
+        self.log_attempt(user_answer, attempt, latency, outcome, points)
 
-        if self.is_correct(user_answer):
+        if outcome == CORRECT:
             self.timer_cancel()
-            if self.first_attempt:
-                self.score += 10
-                messagebox.showinfo("Correct!", "Excellent! +10 points.")
+            if points == quiz_engine.POINTS_FIRST_TRY:
+                self.notify(f"Correct! Excellent! +{points} points.", "success")
             else:
-                self.score += 5
-                messagebox.showinfo("Correct!", "Good! +5 points.")
+                self.notify(f"Correct! Good! +{points} points.", "success")
             if progress:
-                progress["value"] = int((self.question_number / QUESTIONS_TOTAL) * 100)
+                progress["value"] = int((self.engine.question_number / QUESTIONS_TOTAL) * 100)
             self.next_question()
+        elif outcome == RETRY:
+            self.notify("Wrong! Try once more.", "warning")
+            if self.answer_entry:
+                self.answer_entry.delete(0, tk.END)
+                self.answer_entry.focus()
+            self.timer_set(self.engine.time_limit())
+            self.timer_start()
         else:
-            if self.first_attempt:
-                self.first_attempt = False
-                messagebox.showwarning("Incorrect", "Wrong! Try once more.")
-                if self.answer_entry:
-                    self.answer_entry.delete(0, tk.END)
-                    self.answer_entry.focus()
-                secs = {1: 10, 2: 20, 3: 30}.get(self.difficulty, 10)
-                self.timer_set(secs)
-                self.timer_start()
-            else:
-                self.timer_cancel()
-                messagebox.showinfo("Incorrect", "Sorry, moving to next question.")
-                if progress:
-                    progress["value"] = int((self.question_number / QUESTIONS_TOTAL) * 100)
-                self.next_question()
+            self.timer_cancel()
+            self.notify("Sorry, moving to next question.", "error")
+            if progress:
+                progress["value"] = int((self.engine.question_number / QUESTIONS_TOTAL) * 100)
+            self.next_question()
 
     def display_results(self):
-        self.clear_frame()
-        self.create_header("🎯 RESULTS 🎯")
-        grade = self.get_grade(self.score)
-
-        score_label = tk.Label(
-            self.frame,
-            text="Your Final Score: 0/100",
-            font=("Poppins", 20, "bold"),
-            fg="#FFD700",
-            bg=CARD_COLOR,
-        )
-        score_label.pack(pady=20)
-
-        grade_label = tk.Label(
-            self.frame,
-            text=f"Your Rank: {grade}",
-            font=("Poppins", 18),
-            fg=TEXT_COLOR,
-            bg=CARD_COLOR,
-        )
-        grade_label.pack(pady=10)
-
-        self.animate_score(score_label, self.score)
-        self.make_button("Play Again", self.display_menu)
-        self.make_button("Exit", self.window.destroy)
+        if self.results_view is None:
+            view = tk.Frame(self.frame, bg=CARD_COLOR)
+            self.create_header("🎯 RESULTS 🎯", view)
+
+            self.score_label = tk.Label(
+                view,
+                text="Your Final Score: 0/100",
+                font=("Poppins", 20, "bold"),
+                fg="#FFD700",
+                bg=CARD_COLOR,
+            )
+            self.score_label.pack(pady=20)
+
+            self.grade_label = tk.Label(
+                view,
+                text="",
+                font=("Poppins", 18),
+                fg=TEXT_COLOR,
+                bg=CARD_COLOR,
+            )
+            self.grade_label.pack(pady=10)
+
+            self.best_label = tk.Label(
+                view,
+                text="",
+                font=("Poppins", 12),
+                fg=TEXT_COLOR,
+                bg=CARD_COLOR,
+            )
+            self.best_label.pack(pady=(0, 10))
+
+            self.make_button("Play Again", self.display_menu, view)
+            self.make_button("Exit", self.window.destroy, view)
+            self.results_view = view
+
+        grade = self.get_grade(self.engine.score)
+        self.score_label.config(text="Your Final Score: 0/100")
+        self.grade_label.config(text=f"Your Rank: {grade}")
+        self.best_label.config(text=self.record_session(grade))
+        self.show_view(self.results_view)
+        self.animate_score(self.score_label, self.engine.score)
+
+    def record_session(self, grade):
+        # Close the session in the log, fold the new lines into the aggregate
+        # store and return a short "best score" line for the results screen
+        level = self.engine.difficulty
+        try:
+            self.session_log.end_session(self.engine.score, grade)
+            if self.stats is None:
+                self.stats = QuizStats()
+            self.stats.ingest()
+            board = self.stats.leaderboard(level, limit=1)
+        except (OSError, sqlite3.Error):
+            return ""
+        if not board:
+            return ""
+        return f"Best at {TIERS[level].label}: {board[0][0]}/100"
 
     def animate_score(self, label, final_score):
         current = 0
@@ -365,21 +436,15 @@ class QuizApp:
 
     @staticmethod
     def get_grade(score_val):
-        if score_val >= 90:
-            return "A+"
-        if score_val >= 80:
-            return "A"
-        if score_val >= 70:
-            return "B"
-        if score_val >= 60:
-            return "C"
-        if score_val >= 50:
-            return "D"
-        return "F"
+        return quiz_engine.get_grade(score_val)
 
     def run(self):
+        metrics.watch(self.window)
         self.display_menu()
         self.window.mainloop()
+        self.session_log.close()
+        if self.stats is not None:
+            self.stats.close()
 
 
 if __name__ == "__main__":
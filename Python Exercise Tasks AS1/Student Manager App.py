@@ -1,118 +1,119 @@
+import startup  # first, so the startup clock includes the other imports
+import threading
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, simpledialog, ttk
 from pathlib import Path
 
+import metrics
+from background_loader import BackgroundLoader
+from backgrounds import draw_background
+from cohorts import CohortCache, CohortInfo, LoadedCohort, scan_cohorts
+from file_watcher import FileState, FileWatcher, capture, partial_state
+from grading import GradingPolicy
+from name_search import NameSearch
+from student_index import IndexPiece, StudentIndex
+from student_journal import StudentJournal
+from student_snapshot import read_snapshot, write_snapshot
+from student_store import StudentStore, iter_student_batches, load_students
+from virtual_table import VirtualTable
+
 # ============================
 # Load Student Data
 # ============================
 # Path to the data file (use a raw string for Windows backslashes)
 STUDENT_FILE = Path(__file__).parent / "Assets" / "studentMarks.txt"
-
-def load_students():
-    students = []
-    # If file missing, show an error dialog and return empty list
-    if not STUDENT_FILE.exists():
-        messagebox.showerror("Error", f"{STUDENT_FILE} not found")
-        return students
-
-    # Open the file with utf-8 encoding to be safe for names / special chars
-    with STUDENT_FILE.open("r", encoding="utf-8") as f:
-        for line in f:
-            # Strip newline and split by comma expecting 6 fields per line
-            parts = line.strip().split(",")
-            if len(parts) != 6:
-                # If the line doesn't have the expected format, skip it
-                continue
-
-            sid = parts[0]
-            name = parts[1]
-            # coursework components c1..c3 and exam are numeric – convert to int
-            c1, c2, c3 = map(int, parts[2:5])
-            exam = int(parts[5])
-
-            # Total coursework is sum of three coursework marks (max 60)
-            total_course = c1 + c2 + c3
-            # Total marks includes coursework + exam (exam max 100)
-            total_marks = total_course + exam
-            # Percent calculation: total maximum marks = 60 (coursework) + 100 (exam) = 160
-            percent = (total_marks / 160) * 100
-
-            # Simple grade boundaries based on percent
-            if percent >= 70:
-                grade = "A"
-            elif percent >= 60:
-                grade = "B"
-            elif percent >= 50:
-                grade = "C"
-            elif percent >= 40:
-                grade = "D"
-            else:
-                grade = "F"
-
-            # Append a dictionary per student for easy access later
-            students.append({
-                "id": sid,
-                "name": name,
-                "course": total_course,
-                "exam": exam,
-                "percent": percent,
-                "grade": grade
-            })
-
-    return students
-
-students = load_students()
+# More cohorts: every *.txt file in this folder (same format) is listed too.
+# Only each file's count line is read at startup; rows are parsed on first open.
+COHORT_DIR = Path(__file__).parent / "Assets" / "cohorts"
+# Memory allowed for parsed cohorts kept in the cache (least recently used go first)
+COHORT_CACHE_BUDGET = 256 << 20
+
+# Grade boundaries (70/60/50/40) and the 160-mark maximum used for percentages.
+# Change these and call index.regrade(...) to re-grade without reloading
+# (it re-scores the store and re-sorts the index's percent order).
+GRADING_POLICY = GradingPolicy(
+    boundaries=((70, "A"), (60, "B"), (50, "C"), (40, "D")),
+    fail_grade="F",
+    total_max=160,
+)
+
+# Cohorts found so far (header only) and the ones already parsed. The cohort
+# folder is scanned once the window is up (find_cohorts below).
+cohorts = [CohortInfo(STUDENT_FILE)]
+cohort_cache = CohortCache(COHORT_CACHE_BUDGET)
+# The cohort on screen, and the background load filling it (if still running)
+current_cohort = None
+loader = None
+# Background work picking up outside changes to the data file (see Live Reload)
+refresher = None
+# While it runs: the file state the store reflected before the change, and for
+# an append the file position the batches applied so far reach
+refresh_from = None
+refresh_read = None
+
+# The current cohort's data. The store starts empty and is filled by a
+# background load (see start_loading below); the index is updated as each
+# batch arrives.
+store = StudentStore(GRADING_POLICY)
+index = StudentIndex(store)
+# Write-ahead log for add/edit/delete; opened (and replayed) once loading finishes
+journal = None
+# True while the table shows the whole roster, so it grows as batches arrive
+showing_all = False
+# stat() of the data file taken before loading, and whether the binary snapshot was used
+source_stat = None
+source_state = None
+loaded_from_snapshot = False
+# Times the background load from start to finish (a no-op unless metrics are on)
+load_timer = None
 
 # ============================
 # Table Handling
 # ============================
-def clear_table():
-    # Remove all existing rows in the Treeview table
-    for row in table.get_children():
-        table.delete(row)
-
-def insert_student_row(s):
-    # Insert a single row into the table.
+# The table is virtualized: only the visible rows exist as Treeview items and
+# they are filled from the store on demand (see virtual_table.py).
+def student_values(row):
+    # Column values for one student, read from the columns of the store.
     # Note: coursework displayed as e.g. "45/60" and exam as "78/100".
     # percent is shown to 1 decimal place followed by '%' sign.
-    table.insert("", "end", values=(
-        s["id"],
-        s["name"],
-        f"{s['course']}/60",
-        f"{s['exam']}/100",
-        f"{s['percent']:.1f}%",
-        s["grade"]
-    ))
+    sid, name, course, exam, percent, grade = store.row(row)
+    return (
+        sid,
+        name,
+        f"{course}/60",
+        f"{exam}/100",
+        f"{percent:.1f}%",
+        grade
+    )
+
+def show_rows(rows):
+    global showing_all
+    # Display the given row numbers (a list, or a range for the whole roster)
+    showing_all = False
+    vtable.show(rows)
 
 # ============================
 # Button Actions
 # ============================
 def view_all():
-    clear_table()
-    for s in students:
-        insert_student_row(s)
-
-def view_selected_dropdown():
-    # Get selected name from OptionMenu's variable
-    name = dropdown_var.get()
-    clear_table()
-    # Find the first student with matching name and display only that row
-    for s in students:
-        if s["name"] == name:
-            insert_student_row(s)
-            return
+    global showing_all
+    # A range is passed straight through; rows are formatted as they scroll into view
+    show_rows(range(len(store)))
+    showing_all = True
+
+def view_selected_name(name):
+    # Hash lookup by name; show the first student with that name
+    rows = index.find_name(name)
+    show_rows(rows[:1])
 
 def view_highest():
-    clear_table()
-    # Use max with a key function to get student with highest percent
-    top = max(students, key=lambda s: s["percent"])
-    insert_student_row(top)
+    # The index keeps students ordered by percent, so this is a direct read
+    top = index.highest()
+    show_rows([] if top is None else [top])
 
 def view_lowest():
-    clear_table()
-    # Use min with a key function to get student with lowest percent
-    low = min(students, key=lambda s: s["percent"])
-    insert_student_row(low)
+    low = index.lowest()
+    show_rows([] if low is None else [low])
 
 # ============================
 # UI Setup (Modern + Minimal)
@@ -121,28 +122,18 @@ window = tk.Tk()
 window.title("Student Manager")
 window.geometry("780x650")
 window.resizable(False, False)
+# The widgets below are all the first paint waits for. The gradient, the cohort
+# folder scan and the first load are deferred until the window is up (see
+# startup.py and the end of this file).
+launch = startup.Startup(window)
 
-# Gradient Canvas
-canvas = tk.Canvas(window, width=780, height=650, highlightthickness=0)
+# Gradient Canvas (flat until the gradient is drawn)
+canvas = tk.Canvas(window, width=780, height=650, highlightthickness=0, bg="#141E30")
 canvas.pack(fill="both", expand=True)
 
-def draw_gradient(c, col1, col2):
-    # Draw a vertical gradient by drawing many 1px horizontal lines.
-    # c.winfo_rgb returns 16-bit RGB (0..65535) for each component.
-    # We interpolate each component between col1 and col2 over 650 steps,
-    # then shift right by 8 bits to convert 16-bit -> 8-bit for hex formatting.
-    for i in range(650):
-        r1, g1, b1 = c.winfo_rgb(col1)
-        r2, g2, b2 = c.winfo_rgb(col2)
-        # Linear interpolation for each color channel
-        r = (r1 + (r2 - r1) * i // 650) >> 8
-        g = (g1 + (g2 - g1) * i // 650) >> 8
-        b = (b1 + (b2 - b1) * i // 650) >> 8
-        # Draw 1-pixel-high line with the computed color
-        c.create_line(0, i, 780, i, fill=f"#{r:02x}{g:02x}{b:02x}")
-
-# Create a smooth gradient background between two hex colors
-draw_gradient(canvas, "#141E30", "#243B55")
+# Smooth gradient background between two hex colors, drawn as a single cached
+# image item (see backgrounds.py) rather than 650 separate line items
+launch.defer("background", lambda: draw_background(canvas, 780, 650, ("#141E30", "#243B55")))
 
 # Card Container
 # Use a Frame as a centered "card" on top of the gradient canvas.
@@ -169,11 +160,11 @@ for col in columns:
     table.heading(col, text=col)
     table.column(col, width=110, anchor="center")
 
-# Scrollbar: connect vertical scrolling to the Treeview
-scroll = ttk.Scrollbar(table_frame, orient="vertical", command=table.yview)
-table.configure(yscroll=scroll.set)
+# Scrollbar: scrolling moves the virtual table's window over the data
+scroll = ttk.Scrollbar(table_frame, orient="vertical")
 scroll.pack(side="right", fill="y")
 table.pack()
+vtable = VirtualTable(table, scroll, student_values)
 
 # ============================
 # Buttons
@@ -201,16 +192,446 @@ make_btn("View All Students", "#4caf50", view_all)
 make_btn("Highest Score", "#ff9800", view_highest)
 make_btn("Lowest Score", "#f44336", view_lowest)
 
-# Dropdown (OptionMenu) to select a student by name.
-# The OptionMenu will call view_selected_dropdown when a selection changes.
-dropdown_var = tk.StringVar()
-dropdown_var.set("Select Student")
-names = [s["name"] for s in students]
+# Type-ahead search to select a student by name. Each keystroke is a prefix
+# lookup in the index (names kept in sorted order), showing at most
+# name_search.MAX_RESULTS names, so nothing is built per student.
+search = NameSearch(frame, lambda text, limit: index.names_starting_with(text, limit),
+                    view_selected_name)
+search.entry.pack(pady=20)
 
-ttk.OptionMenu(frame, dropdown_var, "Select Student", *names,
-               command=lambda _: view_selected_dropdown()).pack(pady=20)
+# ============================
+# Add / Edit / Delete Records
+# ============================
+# Changes are appended to the write-ahead log next to studentMarks.txt and
+# applied in memory straight away; the data file itself is rewritten in the
+# background from time to time (see student_journal.py).
+FORM_FIELDS = ("Student Number", "Name", "Coursework 1", "Coursework 2",
+               "Coursework 3", "Exam")
+
+def student_form(title, values=None):
+    # Small modal form; returns (sid, name, c1, c2, c3, exam) or None if cancelled
+    dialog = tk.Toplevel(window)
+    dialog.title(title)
+    dialog.configure(bg="#1f1f2e")
+    dialog.resizable(False, False)
+    dialog.transient(window)
+    entries = []
+    for i, label in enumerate(FORM_FIELDS):
+        tk.Label(dialog, text=label, fg="white", bg="#1f1f2e").grid(row=i, column=0, sticky="w", padx=10, pady=4)
+        entry = tk.Entry(dialog, width=24)
+        entry.grid(row=i, column=1, padx=10, pady=4)
+        if values is not None:
+            entry.insert(0, str(values[i]))
+        entries.append(entry)
+    result = []
+
+    def submit():
+        try:
+            sid = int(entries[0].get())
+            c1, c2, c3, exam = (int(e.get()) for e in entries[2:])
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Student number and marks must be whole numbers.", parent=dialog)
+            return
+        result.append((sid, entries[1].get().strip(), c1, c2, c3, exam))
+        dialog.destroy()
+
+    tk.Button(dialog, text="Save", command=submit, bg="#4caf50", fg="white",
+              relief="flat", width=10).grid(row=len(FORM_FIELDS), column=0, columnspan=2, pady=10)
+    dialog.bind("<Return>", lambda e: submit())
+    dialog.grab_set()
+    entries[0].focus()
+    window.wait_window(dialog)
+    return result[0] if result else None
+
+def journal_ready():
+    if journal is None:
+        messagebox.showinfo("Please wait", "Student records are still loading.")
+        return False
+    return True
+
+def pick_student(action):
+    # Use the selected table row if there is one, otherwise ask for a student number
+    rows = vtable.selected_rows()
+    if rows:
+        return rows[0]
+    sid = simpledialog.askinteger(action, "Student number:", parent=window)
+    if sid is None:
+        return None
+    row = index.find_id(sid)
+    if row is None:
+        messagebox.showerror("Not found", f"No student with number {sid}.")
+    return row
+
+def add_record():
+    if not journal_ready():
+        return
+    values = student_form("Add Student")
+    if values is None:
+        return
+    try:
+        row = journal.add(*values)
+    except ValueError as exc:
+        messagebox.showerror("Invalid Record", str(exc))
+        return
+    search.data_changed()
+    show_rows([row])
+
+def edit_record():
+    if not journal_ready():
+        return
+    row = pick_student("Edit Student")
+    if row is None:
+        return
+    current = (store.ids[row], store.name(row), store.c1[row], store.c2[row],
+               store.c3[row], store.exam[row])
+    values = student_form("Edit Student", current)
+    if values is None:
+        return
+    if values[0] != current[0]:
+        messagebox.showerror("Invalid Record", "The student number cannot be changed.")
+        return
+    try:
+        row = journal.edit(*values)
+    except ValueError as exc:
+        messagebox.showerror("Invalid Record", str(exc))
+        return
+    if values[1] != current[1]:
+        search.data_changed()
+    show_rows([row])
+
+def delete_record():
+    if not journal_ready():
+        return
+    row = pick_student("Delete Student")
+    if row is None:
+        return
+    sid, name = store.ids[row], store.name(row)
+    if not messagebox.askyesno("Delete Student", f"Delete {name} ({sid})?"):
+        return
+    journal.delete(sid)
+    search.data_changed()
+    view_all()
+
+edit_bar = tk.Frame(frame, bg="#1f1f2e")
+edit_bar.pack(pady=4)
+for text, color, cmd in (("Add", "#3f51b5", add_record),
+                         ("Edit", "#009688", edit_record),
+                         ("Delete", "#9c27b0", delete_record)):
+    btn = tk.Button(edit_bar, text=text, command=cmd, bg=color, fg="white",
+                    font=("Poppins", 10, "bold"), width=10, relief="flat")
+    btn.pack(side="left", padx=6)
+    btn.bind("<Enter>", hover_in)
+    btn.bind("<Leave>", lambda e, c=color: hover_out(e, c))
 
 # Quit button — uses window.destroy to close the app
 make_btn("Quit", "#777", window.destroy)
 
+# ============================
+# Background Loading
+# ============================
+# Parsing and scoring run on a worker thread; each parsed chunk comes back to
+# the main loop as a small batch store, so the window and buttons work on the
+# rows loaded so far while the rest of the file is still being read.
+load_status = tk.Label(canvas, text="", font=("Poppins", 9), fg="#BBBBBB", bg="#1d2f47")
+canvas.create_window(330, 632, window=load_status)
+load_progress = ttk.Progressbar(canvas, orient="horizontal", length=280, mode="determinate")
+canvas.create_window(590, 632, window=load_progress)
+
+# Cohort picker (one entry per data file)
+cohort_var = tk.StringVar()
+cohort_picker = ttk.OptionMenu(canvas, cohort_var, cohorts[0].label(),
+                               *[c.label() for c in cohorts],
+                               command=lambda label: open_cohort(cohort_by_label[label]))
+cohort_by_label = {c.label(): c for c in cohorts}
+canvas.create_window(110, 632, window=cohort_picker)
+
+def find_cohorts():
+    global cohorts
+    cohorts = scan_cohorts([STUDENT_FILE], COHORT_DIR) or cohorts
+    cohort_by_label.clear()
+    cohort_by_label.update((c.label(), c) for c in cohorts)
+    cohort_picker.set_menu(cohorts[0].label(), *cohort_by_label)
+
+def open_first_cohort():
+    # Unless one was already picked while the window was coming up
+    if current_cohort is None:
+        open_cohort(cohorts[0])
+
+def student_batches(path, size):
+    # Runs on the worker thread. Use the memory-mapped binary snapshot when it
+    # matches the data file, otherwise parse the text file chunk by chunk.
+    # Each item is (batch, came from the snapshot, its index): a snapshot comes
+    # with a complete StudentIndex, a parsed batch with its IndexPiece.
+    with metrics.timer("students.read_snapshot") as t:
+        cached = read_snapshot(path, GRADING_POLICY)
+        t.set(hit=cached is not None)
+    if cached is not None:
+        with metrics.timer("students.index_snapshot", rows=len(cached)):
+            cached_index = StudentIndex(cached)
+        yield (cached, True, cached_index), size
+        return
+    for (batch, piece), done in indexed_batches(path):
+        yield (batch, False, piece), done
+
+def indexed_batches(path, start=None, base=0):
+    # Runs on the worker thread: parsed batches (see iter_student_batches),
+    # each with its index entries for when it is appended at row `base`
+    for batch, done in iter_student_batches(path, policy=GRADING_POLICY, start=start):
+        yield (batch, IndexPiece(batch, base)), done
+        base += len(batch)
+
+def add_batch(item):
+    global store, index, loaded_from_snapshot
+    batch, from_snapshot, built = item
+    if from_snapshot:
+        # The whole cohort, already indexed on the worker: take both over as is
+        loaded_from_snapshot = True
+        store, index = batch, built
+        search.data_changed()
+        if showing_all:
+            vtable.update(range(len(store)))
+        return
+    with metrics.timer("students.apply_batch", rows=len(batch)):
+        apply_batch(batch, built)
+
+def apply_batch(batch, piece=None):
+    start = len(store)
+    store.extend(batch)
+    if piece is not None and piece.base == start:
+        # Index entries were built with the batch: merging them is cheap, and
+        # the percent order is filled in over the next idle moments
+        index.merge(piece)
+        settle_index()
+    elif start == 0:
+        # First batch: one bulk build is cheaper
+        index.rebuild()
+    else:
+        # Rows were added since the piece was built (e.g. an edit during a reload)
+        for row in range(start, len(store)):
+            index.add(row)
+    search.data_changed()
+    if showing_all:
+        vtable.update(range(len(store)))
+
+# Percent keys inserted into the index per step; a step stays well under the
+# loader's 30 ms budget even with millions of students already indexed
+INDEX_KEYS_PER_STEP = 4000
+settling = False
+
+def settle_index():
+    global settling
+    if settling:
+        return
+    settling = True
+
+    def step():
+        global settling
+        if index.catch_up(INDEX_KEYS_PER_STEP):
+            window.after(1, step)
+        else:
+            settling = False
+
+    window.after(1, step)
+
+def show_load_progress(done):
+    load_progress["value"] = done
+    if current_cohort.count:
+        load_status.config(text=f"Loading {current_cohort.name}… {len(store):,} of {current_cohort.count:,}")
+    else:
+        load_status.config(text=f"Loading {current_cohort.name}… {len(store):,} so far")
+
+def finish_loading():
+    global journal
+    if source_stat is not None and not loaded_from_snapshot:
+        # Cache the parsed file as a binary snapshot for the next launch
+        # (written from a copy, before logged edits are applied on top)
+        threading.Thread(target=write_snapshot, args=(store.copy(), current_cohort.path, source_stat),
+                         daemon=True).start()
+    # Data file is in memory: replay any logged edits on top of it
+    journal = StudentJournal(current_cohort.path, store, index, source_state)
+    journal.replay()
+    if showing_all:
+        vtable.update(range(len(store)))
+    load_progress["value"] = load_progress["maximum"]
+    load_status.config(text=f"{len(store):,} students loaded")
+    # Keep the parsed cohort for when it is picked again
+    cohort_cache.put(LoadedCohort(current_cohort, store, index, journal))
+    load_timer.stop(rows=len(store), source="snapshot" if loaded_from_snapshot else "text")
+    # From here on, outside changes to the file are picked up as they happen
+    watcher.watch(current_cohort.path, source_state)
+
+def loading_failed(exc):
+    load_status.config(text="Loading failed")
+    messagebox.showerror("Error", f"Could not load {current_cohort.path}:\n{exc}")
+
+def start_loading():
+    global source_stat, source_state, load_timer, loaded_from_snapshot, loader
+    path = current_cohort.path
+    load_timer = metrics.timer("students.load", mode="background", cohort=current_cohort.name)
+    loaded_from_snapshot = False
+    source_stat = source_state = None
+    load_progress["value"] = 0
+    # If file missing, show an error dialog and start from an empty store
+    if not path.exists():
+        messagebox.showerror("Error", f"{path} not found")
+        finish_loading()
+        return
+    source_stat = path.stat()
+    source_state = capture(path)
+    size = source_stat.st_size
+    load_progress["maximum"] = max(1, size)
+    loader = BackgroundLoader(
+        window,
+        lambda: student_batches(path, size),
+        add_batch,
+        on_progress=show_load_progress,
+        on_done=finish_loading,
+        on_error=loading_failed,
+    )
+    loader.start()
+
+def open_cohort(info):
+    # Show a cohort: straight from the cache if it was parsed before,
+    # otherwise start loading it in the background
+    global store, index, journal, current_cohort, showing_all
+    if info is current_cohort:
+        return
+    if loader is not None and not loader.finished:
+        # The cohort being loaded is dropped; it is loaded again if picked again
+        loader.cancel()
+    left_state = watcher.state
+    if refreshing():
+        # Stopped part way: the cohort keeps the file state its store really
+        # reflects, so the rest of the change is reported again when reopened
+        refresher.cancel()
+        left_state = refreshed_state()
+    leaving = current_cohort and cohort_cache.get(current_cohort.name)
+    if leaving is not None and watcher.path == leaving.info.path:
+        leaving.file_state = left_state
+    watcher.stop()
+    current_cohort = info
+    cohort_var.set(info.label())
+    search.clear()
+    showing_all = False
+    vtable.clear()
+    cached = cohort_cache.get(info.name)
+    if cached is not None:
+        store, index, journal = cached.store, cached.index, cached.journal
+        load_progress["value"] = load_progress["maximum"]
+        load_status.config(text=f"{len(store):,} students loaded")
+        # Changes made while it was in the cache show up on the first check
+        watcher.watch(info.path, cached.file_state)
+        return
+    store = StudentStore(GRADING_POLICY)
+    index = StudentIndex(store)
+    journal = None
+    start_loading()
+
+# ============================
+# Live Reload
+# ============================
+# The data file on screen is watched for changes made outside the app (see
+# file_watcher.py). Rows appended to the end are parsed on a worker thread and
+# added like a loading batch; any other change re-reads the whole file in the
+# background and swaps the new data in at once, keeping the old data on screen
+# meanwhile. The journal's own compactions rewrite the file too; those are
+# recognised by their stat() and ignored. The journal is told which state of
+# the file the store reflects (journal.reflects), so it never compacts over
+# outside changes that haven't been read in yet.
+def refreshing():
+    return refresher is not None and not refresher.finished
+
+def refreshed_state():
+    # The file state the store reflects while a refresh is running
+    if refresh_from is None:
+        # There was no file before: anything there now is a rewrite
+        return FileState(None, None, 0, b"")
+    if refresh_read is None or refresh_read == refresh_from.size:
+        return refresh_from
+    return partial_state(current_cohort.path, refresh_from, refresh_read)
+
+def read_to(done):
+    global refresh_read
+    refresh_read = done
+
+def written_by_journal(state):
+    st = journal.written if journal is not None else None
+    return st is not None and (st.st_ino, st.st_mtime_ns, st.st_size) == state[:3]
+
+def file_appended(old_size):
+    global refresher, refresh_from, refresh_read
+    if refreshing() or journal is None or journal.compacting():
+        watcher.retry()
+        return
+    path, timer = current_cohort.path, metrics.timer("students.reload", mode="append")
+    base, state = len(store), watcher.state
+    refresh_from, refresh_read = watcher.previous, old_size
+
+    def appended():
+        # The journal may compact the file again now its new rows are in the store
+        journal.reflects(state)
+        timer.stop(rows=len(store))
+        load_status.config(text=f"{len(store):,} students loaded")
+
+    refresher = BackgroundLoader(
+        window,
+        lambda: indexed_batches(path, old_size, base),
+        lambda item: apply_batch(*item),
+        on_progress=read_to,
+        on_done=appended,
+        on_error=loading_failed,
+    )
+    refresher.start()
+
+def file_rewritten():
+    global refresher, refresh_from, refresh_read
+    if journal is not None and written_by_journal(watcher.state):
+        return
+    if refreshing() or journal is None or journal.compacting():
+        watcher.retry()
+        return
+    info, state = current_cohort, watcher.state
+    refresh_from, refresh_read = watcher.previous, None
+    load_status.config(text=f"Reloading {info.name}…")
+    refresher = BackgroundLoader(
+        window,
+        lambda: reread_cohort(info.path),
+        lambda item: swap_cohort(info, state, *item),
+        on_error=loading_failed,
+    )
+    refresher.start()
+
+def reread_cohort(path):
+    # Runs on the worker thread: a complete new store and index for the file
+    with metrics.timer("students.reload", mode="rewrite") as t:
+        fresh = load_students(path, policy=GRADING_POLICY)
+        fresh_index = StudentIndex(fresh)
+        t.set(rows=len(fresh))
+    yield (fresh, fresh_index), 1
+
+def swap_cohort(info, state, fresh, fresh_index):
+    global store, index, journal
+    if info is not current_cohort:
+        return
+    # The old journal is closed first so its log isn't written by two journals
+    if journal is not None:
+        journal.close()
+    store, index = fresh, fresh_index
+    journal = StudentJournal(info.path, store, index, state)
+    journal.replay()
+    cohort_cache.put(LoadedCohort(info, store, index, journal))
+    search.data_changed()
+    if showing_all:
+        vtable.update(range(len(store)))
+    else:
+        vtable.clear()
+    load_status.config(text=f"{len(store):,} students loaded")
+
+watcher = FileWatcher(window, file_appended, file_rewritten)
+
+metrics.watch(window)
+launch.defer("cohorts", find_cohorts)
+launch.defer("load", open_first_cohort)
 window.mainloop()
+watcher.stop()
+cohort_cache.close()
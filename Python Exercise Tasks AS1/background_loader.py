@@ -0,0 +1,84 @@
+import queue
+import threading
+import time
+
+# ============================
+# Background Loader
+# ============================
+# Runs a producer (a generator function) on a worker thread and hands whatever
+# it yields back to the Tk main loop. Tk widgets must only be touched from the
+# main thread, so the worker never calls Tk: it puts results on a thread-safe
+# queue and the main loop drains that queue with after().
+#
+# The producer yields (item, progress) pairs; progress can be any number the
+# on_progress callback understands (e.g. bytes read so far).
+
+
+class BackgroundLoader:
+    def __init__(self, widget, producer, on_item, on_progress=None, on_done=None,
+                 on_error=None, poll_ms=50, budget_ms=30):
+        self.widget = widget
+        self.producer = producer
+        self.on_item = on_item
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        # Max time spent handling items per poll so the UI stays responsive
+        self.budget_ms = budget_ms
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = None
+        self._job = None
+        self.finished = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._job = self.widget.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        # Nothing more is handed to the callbacks, and on_done is never called
+        self._cancelled.set()
+        self.finished = True
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    # ---------- Worker thread ----------
+    def _run(self):
+        try:
+            for item, progress in self.producer():
+                if self._cancelled.is_set():
+                    return
+                self._queue.put(("item", item, progress))
+        except Exception as exc:
+            self._queue.put(("error", exc, None))
+            return
+        self._queue.put(("done", None, None))
+
+    # ---------- Main thread ----------
+    def _poll(self):
+        self._job = None
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while time.perf_counter() < deadline:
+            try:
+                kind, payload, progress = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "item":
+                self.on_item(payload)
+                if self.on_progress:
+                    self.on_progress(progress)
+            elif kind == "error":
+                self.finished = True
+                if self.on_error:
+                    self.on_error(payload)
+                return
+            else:
+                self.finished = True
+                if self.on_done:
+                    self.on_done()
+                return
+        if not self._cancelled.is_set():
+            self._job = self.widget.after(self.poll_ms, self._poll)
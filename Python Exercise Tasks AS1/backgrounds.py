@@ -0,0 +1,140 @@
+import hashlib
+import os
+import tkinter as tk
+from pathlib import Path
+
+import metrics
+
+# PIL is optional here: with it the gradient is built with a few image
+# operations in C; without it Tk draws a single column and stretches it.
+# It is imported only when a gradient has to be rendered (not on a disk cache
+# hit), so a normal launch never pays for loading it.
+_pil = None
+
+# ============================
+# Gradient Backgrounds
+# ============================
+# Shared by the apps so each window shows its background as ONE canvas image
+# item instead of hundreds of 1px lines. Rendered images are cached in memory
+# (per Tk interpreter) and as PNG files on disk, keyed by size and colour stops,
+# so later launches just decode a file.
+CACHE_DIR = Path(__file__).parent / "Assets" / ".cache"
+
+_photos = {}
+
+
+def _rgb(color):
+    # "#RRGGBB" or an (r, g, b) tuple -> (r, g, b)
+    if isinstance(color, str):
+        color = color.lstrip("#")
+        return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+    return tuple(int(c) for c in color)
+
+
+def _channel_luts(stops):
+    # One 256-entry lookup table per channel, interpolating linearly through
+    # the colour stops (spaced evenly from top to bottom).
+    colors = [_rgb(c) for c in stops]
+    if len(colors) == 1:
+        colors = colors * 2
+    segments = len(colors) - 1
+    luts = ([], [], [])
+    for v in range(256):
+        pos = v / 255 * segments
+        i = min(int(pos), segments - 1)
+        t = pos - i
+        for ch in range(3):
+            a, b = colors[i][ch], colors[i + 1][ch]
+            luts[ch].append(round(a + (b - a) * t))
+    return luts
+
+
+def cache_path(width, height, stops):
+    key = repr((width, height, [_rgb(c) for c in stops])).encode()
+    return CACHE_DIR / f"gradient-{width}x{height}-{hashlib.sha1(key).hexdigest()[:12]}.png"
+
+
+def _load_pil():
+    # (Image, ImageTk), or None if PIL isn't installed
+    global _pil
+    if _pil is None:
+        try:
+            from PIL import Image, ImageTk
+            _pil = (Image, ImageTk)
+        except ImportError:
+            _pil = False
+    return _pil or None
+
+
+def _render_pil(master, width, height, stops, path):
+    # Vertical ramp 0..255 stretched to the target size, mapped through the
+    # per-channel lookup tables and merged into an RGB image.
+    Image, ImageTk = _load_pil()
+    ramp = Image.linear_gradient("L").resize((width, height), Image.BILINEAR)
+    r, g, b = _channel_luts(stops)
+    img = Image.merge("RGB", (ramp.point(r), ramp.point(g), ramp.point(b)))
+    _save(path, lambda tmp: img.save(tmp, format="PNG"))
+    return ImageTk.PhotoImage(img, master=master)
+
+
+def _render_tk(master, width, height, stops, path):
+    # Build a 1px wide column of colours and let Tk zoom it to full width
+    luts = _channel_luts(stops)
+    column = []
+    for y in range(height):
+        v = round(y / max(1, height - 1) * 255)
+        column.append("{#%02x%02x%02x}" % (luts[0][v], luts[1][v], luts[2][v]))
+    strip = tk.PhotoImage(master=master, width=1, height=height)
+    strip.put(" ".join(column))
+    photo = strip.zoom(width, 1)
+    _save(path, lambda tmp: photo.write(tmp, format="png"))
+    return photo
+
+
+def _save(path, write):
+    # Write via a temporary file so a half-written PNG is never picked up.
+    # A read-only install just means there is no disk cache.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        write(str(tmp))
+        os.replace(tmp, path)
+    except (OSError, tk.TclError):
+        pass
+
+
+def gradient_photo(master, width, height, stops):
+    # Return a PhotoImage of a vertical gradient through `stops` (top to bottom)
+    key = (master.tk, width, height, tuple(stops))
+    photo = _photos.get(key)
+    if photo is not None:
+        metrics.count("background.memory_hits")
+        return photo
+    with metrics.timer("background.render", width=width, height=height) as t:
+        path = cache_path(width, height, stops)
+        photo = None
+        if path.exists():
+            try:
+                photo = tk.PhotoImage(master=master, file=str(path))
+                t.set(source="disk")
+            except tk.TclError:
+                photo = None
+        if photo is None:
+            if _load_pil() is not None:
+                photo = _render_pil(master, width, height, stops, path)
+                t.set(source="pil")
+            else:
+                photo = _render_tk(master, width, height, stops, path)
+                t.set(source="tk")
+    _photos[key] = photo
+    return photo
+
+
+def draw_background(canvas, width, height, stops):
+    # Put the gradient on the canvas as a single image item behind everything else
+    photo = gradient_photo(canvas, width, height, stops)
+    item = canvas.create_image(0, 0, image=photo, anchor="nw")
+    canvas.tag_lower(item)
+    # Keep a reference on the canvas so the image isn't garbage collected
+    canvas.background_photo = photo
+    return item
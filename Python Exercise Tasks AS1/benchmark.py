@@ -0,0 +1,298 @@
+import argparse
+import gc
+import importlib.util
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import grading
+from student_index import StudentIndex
+from student_store import load_students
+from virtual_table import VirtualTable
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+# Generates synthetic data files at a few sizes and times the loaders, the
+# grading pass, the name search and the table repaint, e.g.
+#
+#   python benchmark.py                          (1k and 100k rows)
+#   python benchmark.py --sizes 10M --repeat 3   (the big one, opt-in)
+#   python benchmark.py --out new.json --compare old.json
+#
+# Each result has latency percentiles over the repeats, throughput, and the
+# peak Python memory of one extra traced run (tracemalloc slows code down, so
+# it is kept out of the timed runs). --compare exits with status 1 if any
+# benchmark's median got slower than the tolerance allows.
+SIZES = {"1k": 1_000, "100k": 100_000, "10M": 10_000_000}
+DEFAULT_SIZES = ("1k", "100k")
+DATA_DIR = Path(__file__).parent / "Assets" / ".cache" / "bench"
+
+FIRST_NAMES = ["John", "Sam", "Lee", "Matt", "Anna", "Priya", "Chen", "Olu", "Maria", "Tom",
+               "Aisha", "Jake", "Sofia", "Ivan", "Mei", "Omar", "Lucy", "Raj", "Ella", "Ben"]
+LAST_NAMES = ["Curry", "Sturtivant", "Scott", "Thompson", "Khan", "Smith", "Wang", "Adeyemi",
+              "Garcia", "Brown", "Novak", "Patel", "Jones", "Silva", "Kim", "Evans"]
+
+
+# ---------- Synthetic data ----------
+def generate_students(path, rows, seed=0):
+    # Same format as Assets/studentMarks.txt: count line, then id,name,c1,c2,c3,exam
+    rng = random.Random(seed)
+    randint = rng.randint
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="\n") as f:
+        f.write(f"{rows}\n")
+        lines = []
+        for i in range(rows):
+            name = f"{FIRST_NAMES[randint(0, 19)]} {LAST_NAMES[randint(0, 15)]}"
+            lines.append(f"{1000 + i % 9000},{name},{randint(0, 20)},{randint(0, 20)},"
+                         f"{randint(0, 20)},{randint(0, 100)}\n")
+            if len(lines) >= 50_000:
+                f.writelines(lines)
+                lines.clear()
+        f.writelines(lines)
+    tmp.replace(path)
+
+
+def generate_jokes(path, rows, seed=0):
+    # Same format as Assets/randomJokes.txt: "setup?punchline" per line
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8", newline="\n") as f:
+        lines = []
+        for i in range(rows):
+            who = FIRST_NAMES[rng.randrange(20)]
+            lines.append(f"Why did {who} cross road number {i}?To reach side {rng.randrange(1000)}.\n")
+            if len(lines) >= 50_000:
+                f.writelines(lines)
+                lines.clear()
+        f.writelines(lines)
+    tmp.replace(path)
+
+
+def data_file(kind, rows, seed):
+    # Generated once per (kind, rows, seed) and reused by later runs
+    path = DATA_DIR / f"{kind}-{rows}-{seed}.txt"
+    if not path.exists():
+        print(f"  generating {path.name} ...", flush=True)
+        (generate_students if kind == "students" else generate_jokes)(path, rows, seed)
+    return path
+
+
+def load_app(filename, module_name):
+    # The apps have spaces in their file names, so import them by path
+    spec = importlib.util.spec_from_file_location(module_name, Path(__file__).parent / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------- Measuring ----------
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def measure(name, size, rows, run, repeat, nbytes=None, setup=None):
+    # run() does the work once; setup() (untimed) prepares a fresh input and
+    # its result is passed to run(). Returns one result record.
+    times = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        run(arg) if setup else run()
+        times.append(time.perf_counter() - start)
+
+    arg = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    run(arg) if setup else run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times.sort()
+    median = percentile(times, 50)
+    result = {
+        "name": name,
+        "size": size,
+        "rows": rows,
+        "repeat": repeat,
+        "ms": {
+            "min": times[0] * 1000,
+            "p50": median * 1000,
+            "p90": percentile(times, 90) * 1000,
+            "p99": percentile(times, 99) * 1000,
+            "max": times[-1] * 1000,
+            "mean": sum(times) / len(times) * 1000,
+        },
+        "rows_per_sec": rows / median if median else None,
+        "peak_mb": peak / 1e6,
+    }
+    if nbytes is not None:
+        result["mb_per_sec"] = nbytes / 1e6 / median if median else None
+    print(f"  {name:<24} {size:>5}  p50 {median * 1000:10.2f} ms  "
+          f"{result['rows_per_sec'] or 0:>14,.0f} rows/s  peak {result['peak_mb']:8.1f} MB", flush=True)
+    return result
+
+
+# ---------- Benchmarks ----------
+def bench_students(size, rows, repeat, seed):
+    path = data_file("students", rows, seed)
+    nbytes = path.stat().st_size
+    # student_store.load_students is the synchronous loader (the app runs it when
+    # it re-reads a data file that was rewritten from outside)
+    return measure("students.load", size, rows, lambda: load_students(path), repeat, nbytes)
+
+
+def bench_grading(size, rows, repeat, seed):
+    store = load_students(data_file("students", rows, seed))
+    course, exam = store.course, store.exam
+    return measure("grading.score_cohort", size, rows,
+                   lambda: grading.score_cohort(course, exam), repeat)
+
+
+def bench_search(size, rows, repeat, seed):
+    # Latency of one type-ahead lookup (a keystroke in the name search box)
+    # for a random 1-4 character prefix of a random student's name
+    store = load_students(data_file("students", rows, seed))
+    index = StudentIndex(store)
+    rng = random.Random(seed)
+
+    def prefix():
+        return store.name(rng.randrange(len(store)))[:rng.randint(1, 4)]
+
+    return measure("students.search", size, 1, index.names_starting_with,
+                   max(repeat, 200), setup=prefix)
+
+
+def bench_jokes(size, rows, repeat, seed):
+    path = data_file("jokes", rows, seed)
+    jokes_app = load_app("Alexa Tell Me a Joke.py", "joke_app")
+    jokes_app.JOKES_PATH = jokes_app.JOKES_DIR = path
+    # _load_jokes only needs the module-level path, not a window
+    app = object.__new__(jokes_app.JokeApp)
+
+    def run():
+        app._load_jokes().close()
+
+    return measure("jokes._load_jokes", size, rows, run, repeat, path.stat().st_size)
+
+
+def bench_table(size, rows, repeat, seed, root):
+    # Latency of one repaint of the virtual table at random scroll positions
+    from tkinter import ttk
+
+    store = load_students(data_file("students", rows, seed))
+
+    def values(row):
+        sid, name, course, exam, percent, grade = store.row(row)
+        return sid, name, f"{course}/60", f"{exam}/100", f"{percent:.1f}%", grade
+
+    frame = ttk.Frame(root)
+    tree = ttk.Treeview(frame, columns=tuple(range(6)), show="headings", height=20)
+    scrollbar = ttk.Scrollbar(frame, orient="vertical")
+    table = VirtualTable(tree, scrollbar, values)
+    table.show(range(len(store)))
+    rng = random.Random(seed)
+
+    def run():
+        table.yview("moveto", rng.random())
+        root.update_idletasks()
+
+    result = measure("table.repaint", size, table.height, run, max(repeat, 50))
+    frame.destroy()
+    return result
+
+
+def tk_root():
+    # A hidden Tk root, or None when there is no display (e.g. CI without Xvfb)
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as exc:
+        print(f"  table benchmarks skipped: {exc}")
+        return None
+    root.withdraw()
+    return root
+
+
+# ---------- Reports ----------
+def compare(results, baseline_path, tolerance):
+    # Print benchmarks whose median regressed by more than `tolerance`
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    before = {(r["name"], r["size"]): r["ms"]["p50"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = before.get((r["name"], r["size"]))
+        if not old:
+            continue
+        change = r["ms"]["p50"] / old - 1
+        flag = "REGRESSION" if change > tolerance else ""
+        print(f"  {r['name']:<24} {r['size']:>5}  {old:10.2f} -> {r['ms']['p50']:10.2f} ms  "
+              f"{change:+7.1%}  {flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the portfolio apps' data paths.")
+    parser.add_argument("--sizes", nargs="+", default=list(DEFAULT_SIZES), choices=list(SIZES))
+    parser.add_argument("--only", nargs="+", default=["students", "grading", "search", "jokes", "table"],
+                        choices=["students", "grading", "search", "jokes", "table"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmark-results.json")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown of the median before it counts as a regression")
+    args = parser.parse_args(argv)
+
+    root = tk_root() if "table" in args.only else None
+    results = []
+    for size in args.sizes:
+        rows = SIZES[size]
+        print(f"{size} rows", flush=True)
+        if "students" in args.only:
+            results.append(bench_students(size, rows, args.repeat, args.seed))
+        if "grading" in args.only:
+            results.append(bench_grading(size, rows, args.repeat, args.seed))
+        if "search" in args.only:
+            results.append(bench_search(size, rows, args.repeat, args.seed))
+        if "jokes" in args.only:
+            results.append(bench_jokes(size, rows, args.repeat, args.seed))
+        if root is not None:
+            results.append(bench_table(size, rows, args.repeat, args.seed, root))
+    if root is not None:
+        root.destroy()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "numpy": grading.np is not None,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"results written to {args.out}")
+
+    if args.compare:
+        if compare(results, args.compare, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
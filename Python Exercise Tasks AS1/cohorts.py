@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from pathlib import Path
+
+from student_store import read_header
+
+# ============================
+# Cohorts
+# ============================
+# Each cohort is its own data file in the studentMarks.txt format. Listing
+# cohorts reads only each file's count line; a cohort's rows are parsed the
+# first time it is opened, and parsed cohorts are kept in an LRU cache that
+# drops the least recently used ones once a memory budget is exceeded.
+
+# Rough per-student cost of the lookup index on top of the store's columns
+# (id and name dict entries plus a slot in the sorted percent order)
+INDEX_BYTES_PER_ROW = 160
+
+# Default memory budget for parsed cohorts
+CACHE_BUDGET = 256 << 20
+
+
+class CohortInfo:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.name = self.path.stem
+        # Student count from the header line (None if the file has none)
+        try:
+            self.count, self.data_start = read_header(self.path)
+        except OSError:
+            self.count, self.data_start = None, 0
+
+    def label(self):
+        if self.count is None:
+            return self.name
+        return f"{self.name} ({self.count:,} students)"
+
+
+def scan_cohorts(files=(), directory=None, pattern="*.txt"):
+    # CohortInfo for each given file plus every matching file in `directory`,
+    # skipping missing files and names already listed
+    paths = [Path(f) for f in files]
+    if directory is not None and Path(directory).is_dir():
+        paths.extend(sorted(Path(directory).glob(pattern)))
+    cohorts, names = [], set()
+    for path in paths:
+        if path.stem in names or not path.is_file():
+            continue
+        info = CohortInfo(path)
+        names.add(info.name)
+        cohorts.append(info)
+    return cohorts
+
+
+class LoadedCohort:
+    # A parsed cohort: its store, lookup index and edit journal
+    def __init__(self, info, store, index, journal):
+        self.info = info
+        self.store = store
+        self.index = index
+        self.journal = journal
+        # The data file as this copy last saw it (file_watcher.capture), so a
+        # change made while it sat in the cache is picked up when reopened
+        self.file_state = None
+
+    def nbytes(self):
+        return self.store.nbytes() + len(self.store) * INDEX_BYTES_PER_ROW
+
+    def close(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+class CohortCache:
+    def __init__(self, budget=CACHE_BUDGET):
+        self.budget = budget
+        self._entries = OrderedDict()   # name -> LoadedCohort, oldest first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def get(self, name):
+        # The cohort if cached (and now most recently used), else None
+        cohort = self._entries.get(name)
+        if cohort is not None:
+            self._entries.move_to_end(name)
+        return cohort
+
+    def put(self, cohort):
+        self._entries[cohort.info.name] = cohort
+        self._entries.move_to_end(cohort.info.name)
+        self.evict(keep=cohort.info.name)
+
+    def nbytes(self):
+        # Sizes are taken fresh each time since edits grow or shrink a cohort
+        return sum(c.nbytes() for c in self._entries.values())
+
+    def evict(self, keep=None):
+        # Close least recently used cohorts until within budget. `keep` (the
+        # one on screen) is never dropped, even if it alone is over budget.
+        total = self.nbytes()
+        for name in list(self._entries):
+            if total <= self.budget:
+                break
+            if name == keep:
+                continue
+            cohort = self._entries.pop(name)
+            total -= cohort.nbytes()
+            cohort.close()
+
+    def close(self):
+        for cohort in self._entries.values():
+            cohort.close()
+        self._entries.clear()
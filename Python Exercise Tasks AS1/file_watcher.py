@@ -0,0 +1,136 @@
+import os
+from collections import namedtuple
+from pathlib import Path
+
+# inotify is optional (Linux only): with it the watcher reacts to change
+# events instead of calling stat() on every poll
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = inotify_flags = None
+
+# ============================
+# File Watcher
+# ============================
+# Notices when a data file changes while an app is running and says how:
+#
+#   on_append(old_size)  bytes were only added at the end since last time,
+#                        so just the tail from old_size needs reading
+#   on_rewrite()         anything else (truncated, replaced, edited in place)
+#
+# A change counts as an append when the file is the same inode, has grown,
+# the old end was a line boundary and the last bytes before it are unchanged.
+# Checks run from the Tk loop via after(), so the callbacks are on the main
+# thread; they should hand any real work to a background thread.
+
+# Bytes before the old end compared to tell an append from a rewrite
+TAIL_BYTES = 64
+
+FileState = namedtuple("FileState", "ino mtime_ns size tail")
+
+
+def capture(path):
+    # The file's current FileState, or None if it doesn't exist
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            f.seek(max(0, st.st_size - TAIL_BYTES))
+            tail = f.read(TAIL_BYTES)
+    except FileNotFoundError:
+        return None
+    return FileState(st.st_ino, st.st_mtime_ns, st.st_size, tail)
+
+
+def partial_state(path, state, size):
+    # `state` as if only its file's first `size` bytes had been seen, for an
+    # append read part way (size must be a line boundary after state.size).
+    # The watcher then reports the rest as an append again.
+    try:
+        return state._replace(size=size, tail=_tail_at(path, size))
+    except OSError:
+        # No longer readable: an empty tail makes the next change a rewrite
+        return state._replace(size=size, tail=b"")
+
+
+def _tail_at(path, size):
+    with open(path, "rb") as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return f.read(min(size, TAIL_BYTES))
+
+
+class FileWatcher:
+    def __init__(self, widget, on_append, on_rewrite, interval_ms=1000):
+        self.widget = widget
+        self.on_append = on_append
+        self.on_rewrite = on_rewrite
+        self.interval_ms = interval_ms
+        self.path = None
+        self.state = None
+        self._job = None
+        self._inotify = None
+        # The state before the change last reported to the callbacks
+        self.previous = None
+        self._force = False
+
+    def watch(self, path, state=None):
+        # Follow `path`, taking `state` (from capture(), e.g. taken just
+        # before the file was loaded) as what the app has already seen
+        self.stop()
+        self.path = Path(path)
+        self.state = state if state is not None else capture(self.path)
+        self._open_inotify()
+        self._job = self.widget.after(self.interval_ms, self._poll)
+
+    def retry(self):
+        # Called from a callback that can't handle the change yet (e.g. a
+        # reload is still running): forget it and report it again next poll
+        self.state = self.previous
+        self._force = True
+
+    def stop(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _open_inotify(self):
+        if INotify is None:
+            return
+        try:
+            self._inotify = INotify()
+            # Watch the folder, so a file replaced by rename is noticed too
+            mask = (inotify_flags.MODIFY | inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                    | inotify_flags.CREATE | inotify_flags.DELETE)
+            self._inotify.add_watch(str(self.path.parent), mask)
+        except OSError:
+            self._inotify = None
+
+    def _changed(self):
+        if self._inotify is None:
+            return True
+        try:
+            events = self._inotify.read(timeout=0)
+        except OSError:
+            return True
+        return any(e.name == self.path.name for e in events)
+
+    def _poll(self):
+        self._job = None
+        if self._changed() or self._force:
+            self._force = False
+            self.check()
+        self._job = self.widget.after(self.interval_ms, self._poll)
+
+    def check(self):
+        new = capture(self.path)
+        old = self.state
+        if new == old or new is None:
+            return
+        self.state, self.previous = new, old
+        if (old is not None and new.ino == old.ino and new.size > old.size
+                and old.tail.endswith(b"\n") and _tail_at(self.path, old.size) == old.tail):
+            self.on_append(old.size)
+        else:
+            self.on_rewrite()
@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import os
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import escape, glob
+from pathlib import Path
+
+import metrics
+from joke_index import JokeIndex, MemoryJokes, split_joke
+
+# -----------------------------
+# Joke corpus
+# -----------------------------
+# Jokes can come from many shard files: plain "setup?punchline" text files or
+# gzip-compressed ones (.txt.gz). Each shard is scanned in its own process
+# (line offsets plus a content hash per joke), then the results are merged one
+# shard at a time as they finish, dropping any joke already seen in an
+# earlier shard. Plain shards stay on disk behind a JokeIndex; gzip shards
+# can't be read at an offset, so their jokes are kept in memory.
+
+# Files picked up when a directory is given as a source
+SHARD_PATTERNS = ("*.txt", "*.txt.gz")
+
+
+def find_shards(sources):
+    # sources: files, directories and/or glob patterns -> list of unique paths
+    shards, seen = [], set()
+    for source in sources:
+        source = str(source)
+        if any(c in source for c in "*?["):
+            matches = sorted(glob(source))
+        elif os.path.isdir(source):
+            matches = sorted(m for pattern in SHARD_PATTERNS for m in glob(os.path.join(escape(source), pattern)))
+        else:
+            matches = [source] if os.path.isfile(source) else []
+        for match in matches:
+            path = Path(match).resolve()
+            if path not in seen and path.is_file():
+                seen.add(path)
+                shards.append(path)
+    return shards
+
+
+def joke_hash(setup, punchline):
+    # 64-bit content hash, ignoring case and spacing differences
+    text = " ".join(setup.split()).casefold() + "?" + " ".join(punchline.split()).casefold()
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def scan_shard(path, start=0):
+    # Runs in a worker process. Returns (path, offsets, jokes, hashes): offsets
+    # of each joke line for a plain file, or the jokes themselves for gzip.
+    # A plain file can be scanned from `start` on (lines appended since).
+    path = Path(path)
+    hashes = array("Q")
+    if path.suffix == ".gz":
+        jokes = []
+        with gzip.open(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if "?" in line:
+                    joke = split_joke(line)
+                    jokes.append(joke)
+                    hashes.append(joke_hash(*joke))
+        return path, None, jokes, hashes
+    offsets = array("Q")
+    pos = start
+    with path.open("rb") as f:
+        f.seek(start)
+        for line in f:
+            if b"?" in line:
+                offsets.append(pos)
+                hashes.append(joke_hash(*split_joke(line.decode("utf-8", errors="replace"))))
+            pos += len(line)
+    return path, offsets, None, hashes
+
+
+def build_shard(scan, seen):
+    # Turn one scan result into a JokeIndex / MemoryJokes holding only the
+    # jokes whose hash isn't in `seen` yet (None if nothing new is left)
+    path, offsets, jokes, hashes = scan
+    keep = []
+    for i, h in enumerate(hashes):
+        if h not in seen:
+            seen.add(h)
+            keep.append(i)
+    if not keep:
+        return None
+    if len(keep) < len(hashes):
+        hashes = array("Q", [hashes[i] for i in keep])
+    if jokes is not None:
+        return MemoryJokes([jokes[i] for i in keep], hashes)
+    if len(keep) < len(offsets):
+        offsets = array("Q", [offsets[i] for i in keep])
+    return JokeIndex(path, offsets, hashes)
+
+
+class JokeCorpus:
+    # Several shards seen as one list of jokes. Shards are added as they finish
+    # loading; joke i is found by bisecting the shards' start positions.
+    def __init__(self):
+        self.shards = []
+        self.starts = []
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def add(self, shard):
+        self.starts.append(self.total)
+        self.shards.append(shard)
+        self.total += len(shard)
+
+    def _locate(self, i):
+        if not 0 <= i < self.total:
+            raise IndexError(i)
+        s = bisect_right(self.starts, i) - 1
+        return self.shards[s], i - self.starts[s]
+
+    def get(self, i):
+        shard, local = self._locate(i)
+        return shard.get(local)
+
+    def hash(self, i):
+        # Content hash of joke i (worked out on the spot for shards without hashes)
+        shard, local = self._locate(i)
+        if shard.hashes is not None:
+            return shard.hashes[local]
+        return joke_hash(*shard.get(local))
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+
+
+def iter_corpus(sources, workers=None, seen=None):
+    # Yields (shard or None, (shards done, shards total)) as each shard
+    # finishes, in completion order. A single shard is scanned in this process.
+    # `seen` collects the hashes kept, for deduplicating jokes added later.
+    paths = find_shards(sources)
+    seen = set() if seen is None else seen
+    if len(paths) <= 1 or workers == 1:
+        for done, path in enumerate(paths, 1):
+            yield _merge(lambda: scan_shard(path), seen, path), (done, len(paths))
+        return
+    pool = ProcessPoolExecutor(max_workers=min(len(paths), workers or os.cpu_count() or 1))
+    try:
+        futures = {pool.submit(scan_shard, path): path for path in paths}
+        for done, future in enumerate(as_completed(futures), 1):
+            yield _merge(future.result, seen, futures[future]), (done, len(paths))
+    finally:
+        # Stop early (e.g. the window was closed) without waiting on the rest
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _merge(get_scan, seen, path):
+    # One unreadable shard (bad gzip, permissions) shouldn't lose the others
+    try:
+        with metrics.timer("jokes.scan_shard", shard=path.name) as t:
+            scan = get_scan()
+            t.set(jokes=len(scan[3]))
+    except (OSError, EOFError, ValueError):
+        metrics.count("jokes.shard_errors")
+        return None
+    return build_shard(scan, seen)
+
+
+def load_corpus(sources, workers=None):
+    # Load every shard before returning (for scripts and benchmarks)
+    corpus = JokeCorpus()
+    for shard, _ in iter_corpus(sources, workers):
+        if shard is not None:
+            corpus.add(shard)
+    return corpus
@@ -0,0 +1,131 @@
+import mmap
+import os
+import random
+from array import array
+from pathlib import Path
+
+# -----------------------------
+# Joke index
+# -----------------------------
+# Instead of holding every joke in memory, keep only the byte offset where each
+# joke line starts (8 bytes per joke). Drawing a joke reads just that one line
+# from a memory-mapped view of the file.
+
+
+def split_joke(line):
+    # "Setup?Punchline" -> ("Setup", "Punchline")
+    setup, punchline = line.strip().split("?", 1)
+    return setup.strip(), punchline.strip()
+
+
+class JokeIndex:
+    def __init__(self, path, offsets=None, hashes=None):
+        # offsets: line start positions already worked out elsewhere (e.g. by
+        # the corpus loader, after dropping duplicates); scanned if not given.
+        # hashes: optional content hash per joke, in the same order
+        self.path = Path(path)
+        self.hashes = hashes
+        self._file = None
+        self._mm = None
+        if offsets is None:
+            self.offsets = array("Q")
+            self._scan()
+        else:
+            self.offsets = offsets
+
+    def _scan(self):
+        # One pass over the file recording where each line containing a "?" starts
+        pos = 0
+        append = self.offsets.append
+        with self.path.open("rb") as f:
+            for line in f:
+                if b"?" in line:
+                    append(pos)
+                pos += len(line)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _map(self):
+        if self._mm is None:
+            self._file = self.path.open("rb")
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def line(self, i):
+        mm = self._map()
+        if os.fstat(self._file.fileno()).st_size < len(mm):
+            # Truncated in place since it was mapped: reading past the new end
+            # would crash the process, so treat the index as out of date
+            raise IndexError(f"{self.path} changed since it was indexed")
+        start = self.offsets[i]
+        end = mm.find(b"\n", start)
+        if end == -1:
+            end = len(mm)
+        return mm[start:end].decode("utf-8", errors="replace")
+
+    def get(self, i):
+        return split_joke(self.line(i))
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+
+class MemoryJokes:
+    # Same interface as JokeIndex over a plain list of (setup, punchline) pairs,
+    # used for the built-in fallback jokes
+    def __init__(self, jokes, hashes=None):
+        self.jokes = list(jokes)
+        self.hashes = hashes
+
+    def __len__(self):
+        return len(self.jokes)
+
+    def get(self, i):
+        return self.jokes[i]
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# No-repeat shuffle
+# -----------------------------
+# A Fisher–Yates shuffle done lazily: each draw swaps one random remaining
+# position to the front, but only positions that have been touched are stored
+# (in a dict), so no full permutation of the corpus is ever built. Every joke
+# is drawn once before any joke repeats; then a new round starts.
+class LazyShuffle:
+    def __init__(self, n, rng=None):
+        self.n = n
+        self.rng = rng or random.Random()
+        self._pos = 0
+        self._swaps = {}
+
+    def __len__(self):
+        return self.n
+
+    def remaining(self):
+        return self.n - self._pos
+
+    def grow(self, n):
+        # More items became available; they join the current round
+        self.n = max(self.n, n)
+
+    def draw(self):
+        if self.n == 0:
+            raise IndexError("nothing to draw")
+        if self._pos >= self.n:
+            # Whole corpus seen: start a new round
+            self._pos = 0
+            self._swaps.clear()
+        i = self._pos
+        j = self.rng.randrange(i, self.n)
+        swaps = self._swaps
+        picked = swaps.get(j, j)
+        swaps[j] = swaps.pop(i, i)
+        self._pos += 1
+        return picked
@@ -0,0 +1,184 @@
+import random
+import struct
+from array import array
+from pathlib import Path
+
+# -----------------------------
+# Reaction store
+# -----------------------------
+# Reactions are kept per joke, keyed by the joke's content hash (see
+# joke_corpus.joke_hash), so they survive shards being reordered, merged or
+# re-split. The file is a short header followed by fixed 20-byte records:
+#
+#   hash (u64)  laughs (u32)  meh (u32)  boos (u32)
+#
+# A reaction rewrites its one record in place, or appends a record for a joke
+# that had none. Only jokes that have reactions are in the file or in memory.
+REACTIONS_PATH = Path(__file__).parent / "Assets" / "jokeReactions.bin"
+
+MAGIC = b"JOKRCT1\n"
+RECORD = struct.Struct("<QIII")
+COUNTS = struct.Struct("<III")
+
+# Reaction kinds, in record order
+LAUGH, MEH, BOO = 0, 1, 2
+
+
+def reaction_weight(laughs, meh, boos):
+    # Selection weight of a joke: 1 with no reactions, up with each 😂, down
+    # with each 👎 (😐 is neutral), kept within [0.1, 10]
+    return min(10.0, max(0.1, (1 + laughs) / (1 + boos)))
+
+
+class ReactionStore:
+    def __init__(self, path=REACTIONS_PATH):
+        self.path = Path(path)
+        self.counts = {}   # hash -> [laughs, meh, boos]
+        self._slots = {}   # hash -> record number in the file
+        self._file = None
+        self._load()
+
+    def _load(self):
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not data.startswith(MAGIC):
+            return  # not a reaction file; it is rewritten from scratch on first use
+        # A torn final record (crash mid-append) is ignored and overwritten
+        end = len(data) - (len(data) - len(MAGIC)) % RECORD.size
+        records = RECORD.iter_unpack(memoryview(data)[len(MAGIC):end])
+        for slot, (h, laughs, meh, boos) in enumerate(records):
+            self.counts[h] = [laughs, meh, boos]
+            self._slots[h] = slot
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fresh = not self.path.exists() or not self._slots
+            self._file = self.path.open("r+b" if not fresh else "w+b")
+            if fresh:
+                self._file.write(MAGIC)
+        return self._file
+
+    def get(self, h):
+        # (laughs, meh, boos) for a joke hash
+        return tuple(self.counts.get(h, (0, 0, 0)))
+
+    def weight(self, h):
+        return reaction_weight(*self.get(h))
+
+    def add(self, h, kind):
+        # Count one reaction and write it through; returns the new counts
+        counts = self.counts.setdefault(h, [0, 0, 0])
+        counts[kind] += 1
+        f = self._open()
+        slot = self._slots.get(h)
+        if slot is None:
+            slot = self._slots[h] = len(self._slots)
+            f.seek(len(MAGIC) + slot * RECORD.size)
+            f.write(RECORD.pack(h, *counts))
+        else:
+            f.seek(len(MAGIC) + slot * RECORD.size + 8)
+            f.write(COUNTS.pack(*counts))
+        f.flush()
+        return tuple(counts)
+
+    def weights_for(self, hashes, base=0):
+        # [(base + i, weight)] for each hashes[i] that has reactions. Cheap to
+        # call from a worker thread: nothing is written.
+        if not self.counts or hashes is None:
+            return []
+        counts = self.counts
+        return [(base + i, reaction_weight(*counts[h])) for i, h in enumerate(hashes) if h in counts]
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -----------------------------
+# Weighted sampler
+# -----------------------------
+# A Fenwick (binary indexed) tree of selection weights. Changing one weight,
+# appending one, and drawing an index with probability weight/total are all
+# O(log n). Appending a block of weight-1 items (a newly loaded shard) only
+# has to patch O(log n) tree entries, the rest is a precomputed block.
+class FenwickSampler:
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+        self.tree = array("d")      # tree[i - 1] is node i (1-based)
+        self.weights = array("d")
+
+    def __len__(self):
+        return len(self.weights)
+
+    def _prefix(self, i):
+        # Sum of the first i weights
+        tree = self.tree
+        total = 0.0
+        while i > 0:
+            total += tree[i - 1]
+            i &= i - 1
+        return total
+
+    @property
+    def total(self):
+        return self._prefix(len(self.weights))
+
+    def append(self, weight):
+        n = len(self.weights) + 1
+        low = n & -n
+        self.tree.append(weight + self._prefix(n - 1) - self._prefix(n - low))
+        self.weights.append(weight)
+
+    def update(self, i, weight):
+        delta = weight - self.weights[i]
+        if not delta:
+            return
+        self.weights[i] = weight
+        tree, n = self.tree, len(self.weights)
+        j = i + 1
+        while j <= n:
+            tree[j - 1] += delta
+            j += j & -j
+
+    @staticmethod
+    def uniform_block(start, count):
+        # Tree nodes start+1 .. start+count for weight-1 items, ignoring
+        # anything before `start` (extend_ones patches those). Safe to build
+        # on a worker thread ahead of time.
+        return array("d", [float(i & -i) for i in range(start + 1, start + count + 1)])
+
+    def extend_ones(self, count, block=None):
+        start = len(self.weights)
+        if block is None:
+            block = self.uniform_block(start, count)
+        old_total = self._prefix(start)
+        self.tree.extend(block)
+        self.weights.extend(array("d", [1.0]) * count)
+        # Nodes whose range reaches back past `start` also cover old weights:
+        # at most one such node per power of two
+        p = 1
+        while p <= start + count:
+            i = (start // p + 1) * p
+            if i <= start + count and i & -i == p and i - p < start:
+                self.tree[i - 1] = (i - start) + old_total - self._prefix(i - p)
+            p <<= 1
+
+    def sample(self):
+        # Index i drawn with probability weights[i] / total
+        n = len(self.weights)
+        if n == 0:
+            raise IndexError("nothing to sample")
+        target = self.rng.random() * self.total
+        tree, pos = self.tree, 0
+        step = 1 << (n.bit_length() - 1)
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt - 1] <= target:
+                target -= tree[nxt - 1]
+                pos = nxt
+            step >>= 1
+        return min(pos, n - 1)
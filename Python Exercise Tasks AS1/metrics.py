@@ -0,0 +1,199 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# -----------------------------
+# Opt-in instrumentation
+# -----------------------------
+# Off unless PORTFOLIO_METRICS is set, and then every helper here is close to
+# free (timer() hands back a shared do-nothing object). When it is set, timings
+# and counters are written as JSON lines:
+#
+#   PORTFOLIO_METRICS=1               -> Assets/metrics.jsonl
+#   PORTFOLIO_METRICS=-               -> stderr
+#   PORTFOLIO_METRICS=/tmp/run.jsonl  -> that file
+#
+# Each line has ts, app (script name), pid, kind ("timer", "counter", "rate",
+# "event"), name, plus fields such as ms or rows.
+SETTING = os.environ.get("PORTFOLIO_METRICS", "").strip()
+ENABLED = SETTING.lower() not in ("", "0", "false", "no", "off")
+DEFAULT_PATH = Path(__file__).parent / "Assets" / "metrics.jsonl"
+
+APP = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+_lock = threading.Lock()
+_out = None
+_counters = {}
+_after_calls = 0
+_original_after = None
+
+
+def _stream():
+    global _out
+    if _out is None:
+        if SETTING in ("-", "stderr"):
+            _out = sys.stderr
+        else:
+            path = DEFAULT_PATH if SETTING.lower() in ("1", "true", "yes", "on") else Path(SETTING)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _out = path.open("a", encoding="utf-8")
+    return _out
+
+
+def emit(kind, name, **fields):
+    if not ENABLED:
+        return
+    record = {"ts": round(time.time(), 3), "app": APP, "pid": os.getpid(), "kind": kind, "name": name}
+    record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+    with _lock:
+        try:
+            out = _stream()
+            out.write(line)
+            out.flush()
+        except OSError:
+            pass  # metrics must never break the app
+
+
+def event(name, **fields):
+    emit("event", name, **fields)
+
+
+# ---------- Timers ----------
+class _Timer:
+    # Starts timing when created. Use as a context manager, or call stop()
+    # later for a span that ends in another callback (e.g. a background load).
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.start = time.perf_counter()
+        self.done = False
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def stop(self, **fields):
+        if self.done:
+            return
+        self.done = True
+        self.fields.update(fields)
+        ms = (time.perf_counter() - self.start) * 1000
+        emit("timer", self.name, ms=round(ms, 3), **self.fields)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.fields["error"] = exc_type.__name__
+        self.stop()
+        return False
+
+
+class _NoTimer:
+    def set(self, **fields):
+        pass
+
+    def stop(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_TIMER = _NoTimer()
+
+
+def timer(name, **fields):
+    if not ENABLED:
+        return _NO_TIMER
+    return _Timer(name, fields)
+
+
+# ---------- Counters ----------
+# Summed in memory and written out once per interval by watch() (and at exit),
+# so counting something on a hot path doesn't write a line per call.
+def count(name, n=1):
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def flush_counters(interval=None):
+    with _lock:
+        counters = dict(_counters)
+        _counters.clear()
+    for name, n in counters.items():
+        if interval:
+            emit("counter", name, count=n, per_sec=round(n / interval, 2))
+        else:
+            emit("counter", name, count=n)
+
+
+if ENABLED:
+    atexit.register(flush_counters)
+
+
+# ---------- Tk event loop ----------
+def _patch_after():
+    # Wrap every callback handed to after()/after_idle() so it is counted when
+    # it runs. after_idle() goes through after(), so one patch covers both.
+    global _original_after
+    if _original_after is not None:
+        return
+    import tkinter as tk
+
+    original = _original_after = tk.Misc.after
+
+    def after(self, ms, func=None, *args):
+        if func is None:
+            return original(self, ms)
+
+        def counted(*a):
+            global _after_calls
+            _after_calls += 1
+            return func(*a)
+
+        counted.__name__ = getattr(func, "__name__", "callback")
+        return original(self, ms, counted, *args)
+
+    tk.Misc.after = after
+
+
+def watch(root, interval_ms=1000):
+    # Report after() callbacks per second, event-loop lag and the counters
+    # once per interval while root's mainloop runs (the report itself is
+    # scheduled with the unpatched after() so it isn't counted)
+    global _after_calls
+    if not ENABLED:
+        return
+    _patch_after()
+    schedule = _original_after
+    interval = interval_ms / 1000
+    state = {"last": time.perf_counter()}
+
+    def report():
+        global _after_calls
+        now = time.perf_counter()
+        elapsed = now - state["last"]
+        state["last"] = now
+        calls, _after_calls = _after_calls, 0
+        emit("rate", "tk.after_callbacks", count=calls, per_sec=round(calls / elapsed, 2))
+        # How late this tick ran: time the loop spent busy beyond the interval
+        emit("rate", "tk.loop_lag", ms=round(max(0.0, elapsed - interval) * 1000, 3))
+        flush_counters(elapsed)
+        try:
+            schedule(root, interval_ms, report)
+        except Exception:
+            pass  # window closed
+
+    _after_calls = 0
+    schedule(root, interval_ms, report)
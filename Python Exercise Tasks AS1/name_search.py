@@ -0,0 +1,113 @@
+import tkinter as tk
+
+import metrics
+
+# ============================
+# Type-ahead Name Search
+# ============================
+# An entry box with a short list of matching names shown above it while
+# typing. Matches come from a find(prefix, limit) function returning
+# (names, complete), e.g. StudentIndex.names_starting_with, which is
+# looked up again on every keystroke. Only `limit` names are ever put in the
+# list, so it costs the same for a class of 30 or a roster of a million.
+#
+# Keys: Down moves into the list, Return picks the highlighted (or first)
+# name, Escape closes the list.
+MAX_RESULTS = 50
+
+HINT_COLOR = "#888888"
+
+
+class NameSearch:
+    def __init__(self, parent, find, on_pick, width=28, rows=8, limit=MAX_RESULTS,
+                 font=("Poppins", 11)):
+        # find:    function(prefix, limit) -> (names, complete)
+        # on_pick: function(name), called when a name is chosen
+        self.find = find
+        self.on_pick = on_pick
+        self.limit = limit
+        self.names = []
+        self.var = tk.StringVar()
+        self.entry = tk.Entry(parent, textvariable=self.var, width=width, font=font,
+                              relief="flat", bg="#2b2b3d", fg="white", insertbackground="white")
+        # The list floats over the widgets above the entry (placed, not packed)
+        self.results = tk.Listbox(parent, height=rows, font=font, activestyle="none",
+                                  exportselection=False, relief="flat", bg="#2b2b3d", fg="white",
+                                  selectbackground="#00a0a0")
+        self._picking = False
+
+        self.var.trace_add("write", lambda *_: self.refresh())
+        self.entry.bind("<Down>", self._enter_list)
+        self.entry.bind("<Return>", lambda e: self.pick(0))
+        self.entry.bind("<Escape>", lambda e: self.hide())
+        self.results.bind("<Return>", lambda e: self.pick(self._selected()))
+        self.results.bind("<ButtonRelease-1>", lambda e: self.pick(self.results.nearest(e.y)))
+        self.results.bind("<Escape>", lambda e: (self.hide(), self.entry.focus_set()))
+        self.results.bind("<Up>", self._leave_list)
+
+    # ---------- Public API ----------
+    def refresh(self):
+        # Look the current text up again (also call after the data changes)
+        if self._picking:
+            return
+        text = self.var.get().strip()
+        if not text:
+            self.hide()
+            return
+        with metrics.timer("students.search", chars=len(text)) as t:
+            self.names, complete = self.find(text, self.limit)
+            t.set(matches=len(self.names))
+        results = self.results
+        results.delete(0, "end")
+        if self.names:
+            results.insert("end", *self.names)
+        else:
+            results.insert("end", "No matches")
+            results.itemconfig(0, fg=HINT_COLOR, selectforeground=HINT_COLOR)
+        if not complete:
+            results.insert("end", "… more, keep typing")
+            results.itemconfig(results.size() - 1, fg=HINT_COLOR, selectforeground=HINT_COLOR)
+        results.place(in_=self.entry, relx=0, rely=0, relwidth=1, y=-2, anchor="sw")
+        results.lift()
+
+    def pick(self, i):
+        if i is None or not 0 <= i < len(self.names):
+            return
+        name = self.names[i]
+        # Show the chosen name in the box without searching for it again
+        self._picking = True
+        self.var.set(name)
+        self._picking = False
+        self.hide()
+        self.entry.focus_set()
+        self.on_pick(name)
+
+    def data_changed(self):
+        # Keep an open list up to date while names are loaded or edited
+        if self.results.winfo_ismapped():
+            self.refresh()
+
+    def hide(self):
+        self.results.place_forget()
+
+    def clear(self):
+        self.var.set("")
+
+    # ---------- Keyboard ----------
+    def _selected(self):
+        selection = self.results.curselection()
+        return selection[0] if selection else 0
+
+    def _enter_list(self, event):
+        if self.names and self.results.winfo_ismapped():
+            self.results.focus_set()
+            self.results.selection_clear(0, "end")
+            self.results.selection_set(0)
+            self.results.activate(0)
+        return "break"
+
+    def _leave_list(self, event):
+        # Up from the first name goes back to the entry box
+        if self._selected() == 0:
+            self.entry.focus_set()
+            return "break"
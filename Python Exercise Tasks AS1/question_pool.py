@@ -0,0 +1,92 @@
+import random
+from array import array
+from collections import namedtuple
+
+# -----------------------------
+# Difficulty tiers
+# -----------------------------
+# Each tier sets the operand range, which operators it may use and the seconds
+# allowed per attempt. Add a tier here and it shows up in the quiz menu.
+Tier = namedtuple("Tier", "label low high operators time_limit")
+
+TIERS = {
+    1: Tier("Easy (Single-digit)", 1, 9, "+-", 10),
+    2: Tier("Moderate (Double-digit)", 10, 99, "+-", 20),
+    3: Tier("Advanced (Four-digit)", 1000, 9999, "+-", 30),
+    4: Tier("Expert (× and ÷)", 2, 12, "+-×÷", 20),
+}
+
+# Operators are stored as one byte each: their position in this string
+OPERATORS = "+-×÷"
+
+
+def solve(num1, operation, num2):
+    if operation == "+":
+        return num1 + num2
+    if operation == "-":
+        return num1 - num2
+    if operation == "×":
+        return num1 * num2
+    return num1 // num2
+
+
+# -----------------------------
+# Question pool
+# -----------------------------
+# All the questions for one or more sessions, generated up front from a seed.
+# Stored as three flat columns (left operand, right operand, operator code) so
+# 10k sessions x 10 questions is a few hundred KB rather than 100k tuples.
+class QuestionPool:
+    def __init__(self, per_session):
+        self.per_session = per_session
+        self.left = array("q")
+        self.right = array("q")
+        self.ops = bytearray()
+
+    @property
+    def sessions(self):
+        return len(self.ops) // self.per_session if self.per_session else 0
+
+    def question(self, session, k):
+        # k-th question (0-based) of a session as (num1, operation, num2)
+        i = session * self.per_session + k
+        return self.left[i], OPERATORS[self.ops[i]], self.right[i]
+
+    def answer(self, session, k):
+        return solve(*self.question(session, k))
+
+
+def generate_pool(seed, sessions, per_session=10, tier=TIERS[1]):
+    # Fill `sessions` sessions in one pass. The same seed always gives the same
+    # questions, and no question appears twice within a session.
+    low, high = tier.low, tier.high
+    codes = [OPERATORS.index(op) for op in tier.operators]
+    span = high - low + 1
+    # Upper bound on distinct questions in the tier, to fail fast instead of looping
+    if span * span * len(codes) < per_session:
+        raise ValueError(f"tier {tier.label!r} cannot make {per_session} distinct questions")
+
+    rng = random.Random(seed)
+    randrange = rng.randrange
+    pool = QuestionPool(per_session)
+    left, right, ops = pool.left, pool.right, pool.ops
+    for _ in range(sessions):
+        seen = set()
+        while len(seen) < per_session:
+            code = codes[randrange(len(codes))]
+            b = low + randrange(span)
+            if code == 3:
+                # Division: pick the quotient, so the answer is always a whole number
+                if b == 0:
+                    continue
+                a = b * (low + randrange(span))
+            else:
+                a = low + randrange(span)
+            key = (a, code, b)
+            if key in seen:
+                continue
+            seen.add(key)
+            left.append(a)
+            right.append(b)
+            ops.append(code)
+    return pool
@@ -0,0 +1,245 @@
+import argparse
+import json
+import math
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from question_pool import TIERS, generate_pool, solve
+
+# -----------------------------
+# Quiz rules
+# -----------------------------
+# All of the game logic, with no Tk and no dialogs, so it can be driven by the
+# GUI (Math Quiz Game.py) or run headless in bulk simulations.
+QUESTIONS_TOTAL = 10
+# Seconds allowed per attempt for each difficulty level (see question_pool.TIERS)
+TIME_LIMITS = {level: tier.time_limit for level, tier in TIERS.items()}
+POINTS_FIRST_TRY = 10
+POINTS_SECOND_TRY = 5
+
+# Outcomes of an attempt
+CORRECT = "correct"   # answer right, move on
+RETRY = "retry"       # first attempt wrong / timed out, one more try
+WRONG = "wrong"       # second attempt wrong / timed out, move on
+
+
+def tier_for(difficulty_level):
+    return TIERS.get(difficulty_level, TIERS[3])
+
+
+def random_int(difficulty_level, rng=random):
+    tier = tier_for(difficulty_level)
+    return rng.randint(tier.low, tier.high), rng.randint(tier.low, tier.high)
+
+
+def decide_operation(rng=random, operators="+-"):
+    return rng.choice(operators)
+
+
+def get_grade(score_val):
+    if score_val >= 90:
+        return "A+"
+    if score_val >= 80:
+        return "A"
+    if score_val >= 70:
+        return "B"
+    if score_val >= 60:
+        return "C"
+    if score_val >= 50:
+        return "D"
+    return "F"
+
+
+class QuizEngine:
+    def __init__(self, rng=None, questions_total=QUESTIONS_TOTAL, time_limits=None):
+        self.rng = rng or random.Random()
+        self.questions_total = questions_total
+        self.time_limits = dict(TIME_LIMITS if time_limits is None else time_limits)
+        self.difficulty = 1
+        self.score = 0
+        self.question_number = 0
+        self.first_attempt = True
+        self.num1 = 0
+        self.num2 = 0
+        self.operation = "+"
+        self.pool = None
+        self.session = 0
+
+    # ---------- Session ----------
+    def start(self, difficulty, pool=None, session=0):
+        # Questions come from a pre-generated pool (see question_pool.py). If
+        # none is given, a one-session pool is generated from the engine's rng.
+        self.difficulty = difficulty
+        self.score = 0
+        self.question_number = 0
+        self.first_attempt = True
+        if pool is None:
+            pool = generate_pool(self.rng.getrandbits(64), 1, self.questions_total,
+                                 tier_for(difficulty))
+            session = 0
+        self.pool = pool
+        self.session = session
+
+    @property
+    def finished(self):
+        return self.question_number >= self.questions_total
+
+    def next_question(self):
+        # Returns (num1, operation, num2), or None once the quiz is over
+        if self.finished:
+            return None
+        self.first_attempt = True
+        self.num1, self.operation, self.num2 = self.pool.question(self.session, self.question_number)
+        self.question_number += 1
+        return self.num1, self.operation, self.num2
+
+    def time_limit(self):
+        return self.time_limits.get(self.difficulty, 10)
+
+    def grade(self):
+        return get_grade(self.score)
+
+    # ---------- Answers ----------
+    def is_correct(self, user_answer):
+        return user_answer == solve(self.num1, self.operation, self.num2)
+
+    def submit(self, user_answer):
+        # Returns (outcome, points awarded for this attempt)
+        if self.is_correct(user_answer):
+            points = POINTS_FIRST_TRY if self.first_attempt else POINTS_SECOND_TRY
+            self.score += points
+            return CORRECT, points
+        return self._miss(), 0
+
+    def timeout(self):
+        # Running out of time counts like a wrong attempt
+        return self._miss()
+
+    def _miss(self):
+        if self.first_attempt:
+            self.first_attempt = False
+            return RETRY
+        return WRONG
+
+
+# -----------------------------
+# Batch simulation
+# -----------------------------
+# Plays many sessions with a simple player model to see how scores spread for
+# each difficulty, e.g. to tune points or time limits without a display.
+#
+# Player model per difficulty: probability of a right answer on each attempt,
+# and a log-normal response time (median seconds, spread). An attempt slower
+# than the time limit is a timeout.
+DEFAULT_PLAYER = {
+    1: {"accuracy": 0.92, "median_time": 3.0, "spread": 0.5},
+    2: {"accuracy": 0.78, "median_time": 7.0, "spread": 0.6},
+    3: {"accuracy": 0.55, "median_time": 16.0, "spread": 0.7},
+    4: {"accuracy": 0.70, "median_time": 9.0, "spread": 0.6},
+}
+
+
+def simulate_sessions(difficulty, sessions, seed, player=None, time_limits=None):
+    # Runs `sessions` quizzes in this process; returns Counter(score -> sessions)
+    model = (player or DEFAULT_PLAYER)[difficulty]
+    rng = random.Random(seed)
+    engine = QuizEngine(rng=rng, time_limits=time_limits)
+    limit = engine.time_limits.get(difficulty, 10)
+    mu = math.log(model["median_time"])
+    sigma = model["spread"]
+    accuracy = model["accuracy"]
+    # Every session's questions generated in one batched pass
+    pool = generate_pool(rng.getrandbits(64), sessions, engine.questions_total, tier_for(difficulty))
+    scores = Counter()
+    for session in range(sessions):
+        engine.start(difficulty, pool, session)
+        while engine.next_question() is not None:
+            while True:
+                if rng.lognormvariate(mu, sigma) > limit:
+                    outcome = engine.timeout()
+                else:
+                    answer = solve(engine.num1, engine.operation, engine.num2)
+                    if rng.random() >= accuracy:
+                        answer += rng.choice((-10, -1, 1, 10))
+                    outcome = engine.submit(answer)[0]
+                if outcome != RETRY:
+                    break
+        scores[engine.score] += 1
+    return scores
+
+
+def summarize(scores):
+    total = sum(scores.values())
+    ordered = sorted(scores.items())
+
+    def percentile(p):
+        target = p / 100 * total
+        seen = 0
+        for score, count in ordered:
+            seen += count
+            if seen >= target:
+                return score
+        return ordered[-1][0]
+
+    grades = Counter()
+    for score, count in ordered:
+        grades[get_grade(score)] += count
+    return {
+        "sessions": total,
+        "mean": sum(s * c for s, c in ordered) / total if total else 0.0,
+        "p10": percentile(10),
+        "median": percentile(50),
+        "p90": percentile(90),
+        "scores": {str(s): c for s, c in ordered},
+        "grades": {g: grades[g] for g in ("A+", "A", "B", "C", "D", "F")},
+    }
+
+
+def run_batch(sessions, difficulties=tuple(TIERS), workers=None, seed=0, player=None,
+              time_limits=None, chunk=20000):
+    # Split each difficulty's sessions into chunks and run them across a
+    # process pool. Every chunk has its own seed, so results are repeatable.
+    workers = workers or os.cpu_count() or 1
+    results = {d: Counter() for d in difficulties}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = []
+        for d in difficulties:
+            for k, start in enumerate(range(0, sessions, chunk)):
+                size = min(chunk, sessions - start)
+                chunk_seed = f"{seed}-{d}-{k}"
+                jobs.append((d, pool.submit(simulate_sessions, d, size, chunk_seed, player, time_limits)))
+        for d, job in jobs:
+            results[d].update(job.result())
+    return {d: summarize(c) for d, c in results.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate maths quiz sessions without a display.")
+    parser.add_argument("--sessions", type=int, default=100000, help="sessions per difficulty")
+    parser.add_argument("--difficulty", type=int, nargs="+", default=list(TIERS))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="override the per-attempt time limit for every difficulty")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args(argv)
+
+    limits = None
+    if args.time_limit is not None:
+        limits = {d: args.time_limit for d in args.difficulty}
+    report = run_batch(args.sessions, args.difficulty, args.workers, args.seed, time_limits=limits)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for d, r in report.items():
+        grades = "  ".join(f"{g}:{n / r['sessions']:.1%}" for g, n in r["grades"].items())
+        print(f"Difficulty {d}: {r['sessions']:,} sessions  mean {r['mean']:.1f}  "
+              f"p10/median/p90 {r['p10']}/{r['median']}/{r['p90']}")
+        print(f"    {grades}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import json
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+
+# -----------------------------
+# Session log
+# -----------------------------
+# Every attempt is appended to a JSON-lines file as it happens: which question,
+# the answer given (None for a timeout), attempt number, response latency and
+# points. A final "end" record carries the session's score. The log is
+# append-only; aggregates live in the SQLite store below.
+LOG_PATH = Path(__file__).parent / "Assets" / "quiz_sessions.jsonl"
+DB_PATH = Path(__file__).parent / "Assets" / "quiz_stats.sqlite3"
+
+# Response times are kept as a histogram with this bucket width (milliseconds)
+LATENCY_BUCKET_MS = 50
+
+
+class SessionLog:
+    def __init__(self, path=LOG_PATH):
+        self.path = Path(path)
+        self.session = None
+        self.difficulty = None
+        self.started = None
+        self._file = None
+
+    def _write(self, record):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def start_session(self, difficulty):
+        self.session = uuid.uuid4().hex
+        self.difficulty = difficulty
+        self.started = time.time()
+
+    def record_attempt(self, question_number, num1, operation, num2, answer, attempt,
+                       latency_ms, outcome, points):
+        self._write({
+            "type": "attempt",
+            "session": self.session,
+            "ts": time.time(),
+            "difficulty": self.difficulty,
+            "q": question_number,
+            "question": f"{num1} {operation} {num2}",
+            "op": operation,
+            "answer": answer,
+            "attempt": attempt,
+            "latency_ms": int(latency_ms),
+            "outcome": outcome,
+            "points": points,
+        })
+
+    def end_session(self, score, grade):
+        self._write({
+            "type": "end",
+            "session": self.session,
+            "ts": time.time(),
+            "started": self.started,
+            "difficulty": self.difficulty,
+            "score": score,
+            "grade": grade,
+        })
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -----------------------------
+# Aggregate store
+# -----------------------------
+# SQLite tables that are updated incrementally from the log. The byte offset
+# already ingested is stored too, so each ingest() only reads lines appended
+# since the last one and queries never touch the raw log.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    day TEXT NOT NULL,
+    difficulty INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    grade TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_difficulty ON sessions (difficulty, score DESC, started);
+CREATE INDEX IF NOT EXISTS sessions_by_day ON sessions (day, difficulty);
+CREATE INDEX IF NOT EXISTS sessions_by_score ON sessions (score DESC, started);
+
+CREATE TABLE IF NOT EXISTS op_stats (
+    difficulty INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, op)
+);
+
+CREATE TABLE IF NOT EXISTS latency_hist (
+    difficulty INTEGER NOT NULL,
+    op TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, op, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS ingest_state (
+    log TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL
+);
+"""
+
+
+class QuizStats:
+    def __init__(self, db_path=DB_PATH, log_path=LOG_PATH):
+        self.log_path = Path(log_path)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(db_path))
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # ---------- Ingest ----------
+    def ingest(self):
+        # Fold new log lines into the aggregates; returns how many were read
+        key = str(self.log_path.resolve())
+        row = self.db.execute("SELECT offset FROM ingest_state WHERE log = ?", (key,)).fetchone()
+        offset = row[0] if row else 0
+        try:
+            size = self.log_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < offset:
+            # The log was replaced by a new one: start from its beginning
+            offset = 0
+
+        ops, hist, sessions = {}, {}, []
+        lines = 0
+        with self.log_path.open("rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a line still being written; pick it up next time
+                offset += len(raw)
+                lines += 1
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if rec.get("type") == "attempt":
+                    k = (rec["difficulty"], rec["op"])
+                    attempts, correct = ops.get(k, (0, 0))
+                    ops[k] = (attempts + 1, correct + (rec["outcome"] == "correct"))
+                    hk = k + (rec["latency_ms"] // LATENCY_BUCKET_MS,)
+                    hist[hk] = hist.get(hk, 0) + 1
+                elif rec.get("type") == "end":
+                    started = rec.get("started") or rec["ts"]
+                    sessions.append((rec["session"], started,
+                                     time.strftime("%Y-%m-%d", time.localtime(started)),
+                                     rec["difficulty"], rec["score"], rec["grade"]))
+
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO op_stats VALUES (?, ?, ?, ?) ON CONFLICT (difficulty, op) DO UPDATE "
+                "SET attempts = attempts + excluded.attempts, correct = correct + excluded.correct",
+                [k + v for k, v in ops.items()])
+            self.db.executemany(
+                "INSERT INTO latency_hist VALUES (?, ?, ?, ?) ON CONFLICT (difficulty, op, bucket) "
+                "DO UPDATE SET count = count + excluded.count",
+                [k + (v,) for k, v in hist.items()])
+            self.db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", sessions)
+            self.db.execute("INSERT OR REPLACE INTO ingest_state VALUES (?, ?)", (key, offset))
+        return lines
+
+    # ---------- Queries ----------
+    def leaderboard(self, difficulty=None, limit=10, since_day=None):
+        # Best sessions as (score, grade, day, difficulty), highest first
+        sql = "SELECT score, grade, day, difficulty FROM sessions"
+        where, args = [], []
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            args.append(difficulty)
+        if since_day is not None:
+            where.append("day >= ?")
+            args.append(since_day)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY score DESC, started LIMIT ?"
+        return self.db.execute(sql, args + [limit]).fetchall()
+
+    def accuracy_by_operation(self, difficulty=None):
+        # {operator: fraction of attempts answered correctly}
+        sql = "SELECT op, SUM(correct), SUM(attempts) FROM op_stats"
+        args = ()
+        if difficulty is not None:
+            sql += " WHERE difficulty = ?"
+            args = (difficulty,)
+        sql += " GROUP BY op"
+        return {op: correct / attempts for op, correct, attempts in self.db.execute(sql, args) if attempts}
+
+    def median_response_ms(self, difficulty=None, op=None):
+        # Median from the latency histogram (accurate to one bucket width)
+        sql = "SELECT bucket, SUM(count) FROM latency_hist"
+        where, args = [], []
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            args.append(difficulty)
+        if op is not None:
+            where.append("op = ?")
+            args.append(op)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY bucket ORDER BY bucket"
+        buckets = self.db.execute(sql, args).fetchall()
+        total = sum(count for _, count in buckets)
+        if not total:
+            return None
+        seen = 0
+        for bucket, count in buckets:
+            seen += count
+            if seen * 2 >= total:
+                return (bucket + 0.5) * LATENCY_BUCKET_MS
+        return None
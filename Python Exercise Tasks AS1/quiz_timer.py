@@ -0,0 +1,72 @@
+import math
+import time
+
+# -----------------------------
+# Countdown timer engine
+# -----------------------------
+# Remaining time is always computed from a deadline on the monotonic clock, so
+# late callbacks from a busy event loop can't make the countdown drift. Redraws are scheduled only as often as something visibly changes: the
+# arc moves by about one pixel, or the whole-second label ticks over.
+
+
+class CountdownTimer:
+    def __init__(self, widget, on_tick, on_timeout, arc_pixels=157,
+                 min_interval_ms=16, max_interval_ms=250):
+        # on_tick(remaining_seconds, fraction_left) is called on every redraw;
+        # on_timeout() once when the deadline passes.
+        # arc_pixels: length of the full arc on screen (circumference of the dial)
+        self.widget = widget
+        self.on_tick = on_tick
+        self.on_timeout = on_timeout
+        self.arc_pixels = arc_pixels
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.total = 0.0
+        self.deadline = None
+        self._job = None
+
+    # ---------- Control ----------
+    def start(self, seconds):
+        self.cancel()
+        self.total = float(seconds)
+        self.deadline = time.monotonic() + self.total
+        self._tick()
+
+    def cancel(self):
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+        self._job = None
+        self.deadline = None
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining(self):
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
+
+    # ---------- Internals ----------
+    def _tick(self):
+        self._job = None
+        left = self.remaining()
+        fraction = left / self.total if self.total > 0 else 0.0
+        self.on_tick(left, fraction)
+        if left <= 0:
+            self.deadline = None
+            self.on_timeout()
+            return
+        self._job = self.widget.after(self._next_interval_ms(left), self._tick)
+
+    def _next_interval_ms(self, left):
+        # Time for the arc to shrink by one pixel
+        arc_step = self.total / self.arc_pixels
+        # Time until the whole-second label (ceil of remaining) changes
+        to_label = left - math.floor(left) or 1.0
+        wait = min(arc_step, to_label, left)
+        ms = int(wait * 1000) + 1
+        return max(self.min_interval_ms, min(self.max_interval_ms, ms))
@@ -0,0 +1,96 @@
+import time
+
+# Taken as early as possible: the apps import this module before anything else
+STARTED = time.perf_counter()
+
+import json
+import sys
+from pathlib import Path
+
+import metrics
+
+# -----------------------------
+# Startup pipeline
+# -----------------------------
+# Gets a plain window on screen before anything optional runs. An app builds
+# its basic widgets, hands the rest (gradient backgrounds, folder scans,
+# starting background loads) to Startup.defer(), then enters mainloop().
+# The deferred steps wait for the window's first Expose (the first paint),
+# then run one per idle callback so events are handled in between.
+#
+# With metrics on, the times since launch are written as timers:
+#
+#   startup.first_paint   window first drawn
+#   startup.<step>        each deferred step (its own duration)
+#   startup.ready         every deferred step done
+#
+# and `python startup.py [metrics.jsonl]` summarises them per app.
+
+
+def since_start_ms():
+    return round((time.perf_counter() - STARTED) * 1000, 3)
+
+
+class Startup:
+    def __init__(self, window):
+        self.window = window
+        self.steps = []
+        self.painted = False
+        self.ready = False
+        window.bind("<Expose>", self._exposed, add="+")
+
+    def defer(self, name, step):
+        # Run step() after the first paint, in the order deferred
+        self.steps.append((name, step))
+
+    def _exposed(self, event):
+        if self.painted:
+            return
+        self.painted = True
+        metrics.emit("timer", "startup.first_paint", ms=since_start_ms())
+        self.window.after_idle(self._next)
+
+    def _next(self):
+        if not self.steps:
+            self.ready = True
+            metrics.emit("timer", "startup.ready", ms=since_start_ms())
+            return
+        name, step = self.steps.pop(0)
+        with metrics.timer(f"startup.{name}"):
+            step()
+        self.window.after_idle(self._next)
+
+
+# -----------------------------
+# Report
+# -----------------------------
+def summarise(path):
+    # {app: {timer name: [ms, ...]}} for the startup timers in a metrics file
+    runs = {}
+    with Path(path).open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("kind") == "timer" and record.get("name", "").startswith("startup."):
+                runs.setdefault(record["app"], {}).setdefault(record["name"], []).append(record["ms"])
+    return runs
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = Path(argv[0]) if argv else metrics.DEFAULT_PATH
+    if not path.exists():
+        print(f"{path} not found; run the apps with PORTFOLIO_METRICS=1 first")
+        return
+    for app, timers in sorted(summarise(path).items()):
+        print(app)
+        for name, values in sorted(timers.items()):
+            values.sort()
+            print(f"  {name:<28} runs {len(values):>4}  p50 {values[len(values) // 2]:9.1f} ms"
+                  f"  worst {values[-1]:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+# ============================
+# Sorted Buckets
+# ============================
+# A sorted list split into small buckets. Finding a key is a bisect over the
+# bucket maxima plus a bisect inside one bucket, and inserting or removing only
+# shifts the items of a single bucket, so the order never has to be rebuilt.
+# A Fenwick tree over the bucket sizes makes rank() O(log n) as well; it is
+# patched on every insert and remove, and rebuilt on the next rank() after a
+# bucket is split or dropped (once per BUCKET_SIZE inserts at most).
+BUCKET_SIZE = 512
+
+
+class SortedBuckets:
+    def __init__(self, items=()):
+        items = sorted(items)
+        self._buckets = [items[i:i + BUCKET_SIZE] for i in range(0, len(items), BUCKET_SIZE)]
+        self._maxes = [b[-1] for b in self._buckets]
+        self._len = len(items)
+        self._sizes = None  # Fenwick tree of bucket sizes, None until needed
+
+    def __len__(self):
+        return self._len
+
+    def _size_tree(self):
+        tree = self._sizes
+        if tree is None:
+            # tree[i - 1] is node i (1-based): built in one pass by pushing
+            # each node's sum up to its parent
+            tree = [len(b) for b in self._buckets]
+            n = len(tree)
+            for i in range(1, n + 1):
+                parent = i + (i & -i)
+                if parent <= n:
+                    tree[parent - 1] += tree[i - 1]
+            self._sizes = tree
+        return tree
+
+    def _resized(self, i, delta):
+        # Bucket i gained (or lost) `delta` keys without being split or dropped
+        tree = self._sizes
+        if tree is None:
+            return
+        j, n = i + 1, len(tree)
+        while j <= n:
+            tree[j - 1] += delta
+            j += j & -j
+
+    def __iter__(self):
+        for bucket in self._buckets:
+            yield from bucket
+
+    def __reversed__(self):
+        for bucket in reversed(self._buckets):
+            yield from reversed(bucket)
+
+    def first(self):
+        return self._buckets[0][0]
+
+    def last(self):
+        return self._buckets[-1][-1]
+
+    def add(self, key):
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._sizes = None
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            # Larger than everything: goes on the end of the last bucket
+            i -= 1
+            self._buckets[i].append(key)
+            self._maxes[i] = key
+        else:
+            insort(self._buckets[i], key)
+        self._len += 1
+        self._resized(i, 1)
+        # Split a bucket once it grows too large so inserts stay cheap
+        bucket = self._buckets[i]
+        if len(bucket) > 2 * BUCKET_SIZE:
+            half = bucket[BUCKET_SIZE:]
+            del bucket[BUCKET_SIZE:]
+            self._buckets.insert(i + 1, half)
+            self._maxes[i] = bucket[-1]
+            self._maxes.insert(i + 1, half[-1])
+            self._sizes = None
+
+    def update(self, keys):
+        # Add many keys at once; `keys` must be sorted. Each bucket they fall
+        # in gets its share in one go: a few keys are insorted, a larger share
+        # is added with one extend + sort (a merge of two sorted runs).
+        if not keys:
+            return
+        buckets, maxes = self._buckets, self._maxes
+        if not buckets:
+            buckets.extend(keys[i:i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE))
+            maxes.extend(b[-1] for b in buckets)
+            self._len = len(keys)
+            self._sizes = None
+            return
+        self._len += len(keys)
+        pos, i = 0, bisect_left(maxes, keys[0])
+        while pos < len(keys):
+            if i >= len(maxes) - 1:
+                # Last bucket takes everything that's left
+                i = len(maxes) - 1
+                end = len(keys)
+            else:
+                end = bisect_right(keys, maxes[i], pos)
+                if end == pos:
+                    i = bisect_left(maxes, keys[pos], i)
+                    continue
+            bucket = buckets[i]
+            if end - pos <= 16:
+                for key in keys[pos:end]:
+                    insort(bucket, key)
+            else:
+                bucket.extend(keys[pos:end])
+                bucket.sort()
+            if len(bucket) > 2 * BUCKET_SIZE:
+                # Split into BUCKET_SIZE pieces so later inserts stay cheap
+                pieces = [bucket[j:j + BUCKET_SIZE] for j in range(0, len(bucket), BUCKET_SIZE)]
+                buckets[i:i + 1] = pieces
+                maxes[i:i + 1] = [p[-1] for p in pieces]
+                i += len(pieces) - 1
+                self._sizes = None
+            else:
+                maxes[i] = bucket[-1]
+                self._resized(i, end - pos)
+            pos = end
+            i += 1
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise KeyError(key)
+        bucket = self._buckets[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            raise KeyError(key)
+        del bucket[j]
+        self._len -= 1
+        if bucket:
+            self._maxes[i] = bucket[-1]
+            self._resized(i, -1)
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+            self._sizes = None
+
+    def rank(self, key):
+        # Number of keys strictly smaller than `key`
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return self._len
+        # Keys in buckets 0 .. i-1: a prefix sum over the Fenwick tree
+        tree, before, j = self._size_tree(), 0, i
+        while j > 0:
+            before += tree[j - 1]
+            j &= j - 1
+        return before + bisect_left(self._buckets[i], key)
+
+    def ceiling(self, key):
+        # Smallest key >= `key`, or None
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return None
+        bucket = self._buckets[i]
+        return bucket[bisect_left(bucket, key)]
+
+    def irange(self, lo, hi):
+        # Keys with lo <= key < hi, in ascending order
+        i = bisect_left(self._maxes, lo)
+        if i == len(self._maxes):
+            return
+        j = bisect_left(self._buckets[i], lo)
+        for bucket in self._buckets[i:]:
+            end = bisect_left(bucket, hi)
+            yield from bucket[j:end]
+            if end < len(bucket):
+                return
+            j = 0
+
+
+# ============================
+# Student Index
+# ============================
+# Built once at load time over a StudentStore and then kept up to date as rows
+# are added, edited or moved: a hash index by id, a hash index by name (one
+# list of rows per name so duplicates are kept), the rows ordered by percent
+# and the distinct names in case-insensitive order for prefix search.
+
+# Most names one prefix search returns
+MATCH_LIMIT = 50
+
+# Sorts after any character a name can contain; closes a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+class IndexPiece:
+    # Index entries for a batch of rows that will be appended at row `base`,
+    # built on a worker thread so StudentIndex.merge() on the main thread only
+    # has dict updates and one bulk insert into the percent order left to do
+    def __init__(self, batch, base):
+        self.base = base
+        self.count = len(batch)
+        rows = range(base, base + len(batch))
+        self.ids = dict(zip(batch.ids, rows))
+        names = batch.names
+        self.names = {}
+        for row, ref in zip(rows, batch.name_ref):
+            self.names.setdefault(names[ref], []).append(row)
+        self.order = sorted(zip(batch.percent, rows))
+
+
+class StudentIndex:
+    def __init__(self, store):
+        self.store = store
+        self.rebuild()
+
+    def rebuild(self):
+        store = self.store
+        self._by_id = {}
+        self._by_name = {}
+        for row in range(len(store)):
+            self._by_id[store.ids[row]] = row
+            self._by_name.setdefault(store.name(row), []).append(row)
+        self._percent_order = SortedBuckets(zip(store.percent, range(len(store))))
+        # Sorted runs of percent keys from merge() not inserted into the order
+        # yet; catch_up() inserts them a slice at a time, and anything that
+        # reads the order inserts the rest first
+        self._pending = []
+        self._names = SortedBuckets((name.casefold(), name) for name in self._by_name)
+        self._last_match = None
+
+    def __len__(self):
+        return len(self._percent_order) + sum(len(run) for run in self._pending)
+
+    @property
+    def _order(self):
+        while self._pending:
+            self._percent_order.update(self._pending.pop())
+        return self._percent_order
+
+    def catch_up(self, limit):
+        # Insert up to `limit` pending percent keys (the largest first, so what
+        # is left of each run stays sorted). Returns True while more remain.
+        while self._pending and limit > 0:
+            run = self._pending[-1]
+            if len(run) <= limit:
+                self._pending.pop()
+                self._percent_order.update(run)
+                limit -= len(run)
+            else:
+                self._percent_order.update(run[-limit:])
+                del run[-limit:]
+                limit = 0
+        return bool(self._pending)
+
+    def regrade(self, policy):
+        # Re-score the store under a new grading policy and re-key the percent
+        # order to match. Use this rather than store.regrade() on an indexed store.
+        self.store.regrade(policy)
+        store = self.store
+        self._percent_order = SortedBuckets(zip(store.percent, range(len(store))))
+        self._pending = []
+
+    # ---------- Incremental updates ----------
+    def add(self, row):
+        # Call after a row has been appended to (or edited in) the store
+        store = self.store
+        self._by_id[store.ids[row]] = row
+        name = store.name(row)
+        rows = self._by_name.setdefault(name, [])
+        if not rows:
+            self._names.add((name.casefold(), name))
+            self._last_match = None
+        insort(rows, row)
+        self._percent_order.add((store.percent[row], row))
+
+    def merge(self, piece):
+        # Call after the piece's batch has been appended to the store at
+        # piece.base (the rows must follow every row already indexed). Ids and
+        # names are indexed now; the percent keys wait for catch_up().
+        self._by_id.update(piece.ids)
+        by_name = self._by_name
+        new_names = []
+        for name, rows in piece.names.items():
+            mine = by_name.get(name)
+            if mine is None:
+                by_name[name] = rows
+                new_names.append((name.casefold(), name))
+            else:
+                mine.extend(rows)
+        if new_names:
+            new_names.sort()
+            self._names.update(new_names)
+            self._last_match = None
+        if piece.order:
+            self._pending.append(piece.order)
+
+    def remove(self, row):
+        # Call before a row is edited or deleted, while it still has its old values
+        store = self.store
+        if self._by_id.get(store.ids[row]) == row:
+            del self._by_id[store.ids[row]]
+        name = store.name(row)
+        rows = self._by_name[name]
+        rows.remove(row)
+        if not rows:
+            del self._by_name[name]
+            self._names.remove((name.casefold(), name))
+            self._last_match = None
+        self._order.remove((store.percent[row], row))
+
+    # ---------- Lookups ----------
+    def find_id(self, sid):
+        return self._by_id.get(sid)
+
+    def find_name(self, name):
+        # Every row with this exact name, in file order
+        return list(self._by_name.get(name, ()))
+
+    def names_starting_with(self, prefix, limit=MATCH_LIMIT):
+        # Up to `limit` distinct names starting with `prefix` (ignoring case),
+        # alphabetically, and whether that is all of them. Typing one more
+        # character just filters the previous answer when it was complete.
+        key = prefix.casefold()
+        last = self._last_match
+        if last is not None and last[3] and last[1] == limit and key.startswith(last[0]):
+            names = [name for name in last[2] if name.casefold().startswith(key)]
+            complete = True
+        else:
+            found = self._names.irange((key,), (key + _PREFIX_END,))
+            names = [name for _, name in islice(found, limit + 1)]
+            complete = len(names) <= limit
+            del names[limit:]
+        self._last_match = (key, limit, names, complete)
+        return names, complete
+
+    # ---------- Order statistics ----------
+    def highest(self):
+        if not self._order:
+            return None
+        # Among equal top scores, return the first row, like max() over the list
+        best = self._order.last()[0]
+        return self._order.ceiling((best, -1))[1]
+
+    def lowest(self):
+        if not self._order:
+            return None
+        return self._order.first()[1]
+
+    def top(self, n):
+        out = []
+        for _, row in reversed(self._order):
+            if len(out) >= n:
+                break
+            out.append(row)
+        return out
+
+    def bottom(self, n):
+        out = []
+        for _, row in self._order:
+            if len(out) >= n:
+                break
+            out.append(row)
+        return out
+
+    def percentile_rank(self, percent):
+        # Percentage of the cohort scoring at or below `percent`
+        if not self._order:
+            return 0.0
+        return self._order.rank((percent, float("inf"))) / len(self._order) * 100
+
+    def between(self, low, high):
+        # Rows scoring from low% to high% inclusive, lowest first
+        return [row for _, row in self._order.irange((low, -1), (high, float("inf")))]
@@ -0,0 +1,239 @@
+import os
+import threading
+import zlib
+from pathlib import Path
+
+from student_store import COURSEWORK_MAX, EXAM_MAX, ID_MAX, ID_MIN, write_students
+
+# ============================
+# Write-Ahead Log for Student Edits
+# ============================
+# Adds, edits and deletes are appended to "<data file>.wal" (and fsync'd)
+# before they are applied in memory, so an edit costs one small append no
+# matter how big the roster is. Every line carries a CRC32; a line torn by a
+# crash fails the check and is dropped on the next start.
+#
+# Once the log holds COMPACT_AFTER records (counted after the change is applied
+# in memory, so the copy includes it) it is rotated to "<data file>.wal.1"
+# and a background thread rewrites the data file from a copy of the store,
+# then deletes the rotated log. Startup = read the data file, then replay
+# ".wal.1" (only present if a compaction was interrupted) and ".wal".
+#
+# Records are upserts/deletes keyed by student id, so replaying a log whose
+# changes are already in the data file leaves the data unchanged.
+#
+# A compaction only replaces the data file if it is still the file the store
+# was loaded from (same inode, mtime and size as last recorded with
+# reflects()). If something else wrote it meanwhile, e.g. rows appended from
+# outside that the app hasn't read yet, the compaction is skipped and ".wal.1"
+# kept, to be folded in by the next compaction or start.
+COMPACT_AFTER = 5000
+
+
+def validate_record(sid, name, c1, c2, c3, exam):
+    # Any student number the id column can hold (a signed 32-bit int)
+    if not ID_MIN <= sid <= ID_MAX:
+        raise ValueError(f"Student number must be between {ID_MIN} and {ID_MAX}")
+    if not name.strip() or "," in name or "\n" in name:
+        raise ValueError("Name must be non-empty and cannot contain commas")
+    for mark in (c1, c2, c3):
+        if not 0 <= mark <= COURSEWORK_MAX:
+            raise ValueError(f"Coursework marks must be between 0 and {COURSEWORK_MAX}")
+    if not 0 <= exam <= EXAM_MAX:
+        raise ValueError(f"Exam mark must be between 0 and {EXAM_MAX}")
+
+
+def _signature(st):
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _encode(fields):
+    payload = ",".join(str(f) for f in fields)
+    return f"{payload},{zlib.crc32(payload.encode('utf-8')):08x}\n".encode("utf-8")
+
+
+def _decode(line):
+    # Returns the record's fields, or None if the line is torn or corrupt
+    try:
+        text = line.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if not text.endswith("\n"):
+        return None
+    payload, _, crc = text[:-1].rpartition(",")
+    if not payload or crc != f"{zlib.crc32(payload.encode('utf-8')):08x}":
+        return None
+    return payload.split(",")
+
+
+class StudentJournal:
+    def __init__(self, data_path, store, index, file_state=None):
+        # file_state: the data file as the store was loaded from it (a
+        # file_watcher.FileState); by default the file as it is now
+        self.data_path = Path(data_path)
+        self.log_path = self.data_path.with_name(self.data_path.name + ".wal")
+        self.old_log_path = self.data_path.with_name(self.data_path.name + ".wal.1")
+        self.store = store
+        self.index = index
+        self.records = 0
+        self._log = None
+        self._compactor = None
+        # stat() of the data file as the last compaction wrote it, so a file
+        # watcher can tell the journal's own rewrites from outside changes
+        self.written = None
+        self._seen = None
+        if file_state is not None:
+            self.reflects(file_state)
+        elif self.data_path.exists():
+            self._seen = _signature(self.data_path.stat())
+
+    def reflects(self, state):
+        # The store now holds everything in the data file as it was in `state`
+        # (a file_watcher.FileState, e.g. once an outside append is applied)
+        self._seen = state[:3] if state is not None else None
+
+    # ---------- Startup ----------
+    def replay(self):
+        # Apply any logged changes on top of the freshly loaded data file
+        if self.old_log_path.exists():
+            self._replay_file(self.old_log_path)
+        if self.log_path.exists():
+            self.records = self._replay_file(self.log_path)
+        self._log = self.log_path.open("ab")
+        if self.old_log_path.exists():
+            # A compaction was interrupted last time: finish it now
+            self._start_compaction(rotate=False)
+
+    def apply_logged(self):
+        # Read-only replay, for readers sharing the files with the app (e.g.
+        # student_server.py): applies logged changes but never opens the log
+        # for writing, repairs a torn tail or starts a compaction
+        for path in (self.old_log_path, self.log_path):
+            try:
+                self._replay_file(path, repair=False)
+            except FileNotFoundError:
+                pass
+
+    def _replay_file(self, path, repair=True):
+        good_end = 0
+        count = 0
+        with path.open("rb") as f:
+            for line in f:
+                fields = _decode(line)
+                if fields is None:
+                    break
+                self._apply(fields)
+                good_end += len(line)
+                count += 1
+        if repair and good_end != path.stat().st_size:
+            # Drop a torn tail so new records aren't appended after garbage
+            with path.open("r+b") as f:
+                f.truncate(good_end)
+        return count
+
+    # ---------- Edits ----------
+    def add(self, sid, name, c1, c2, c3, exam):
+        validate_record(sid, name, c1, c2, c3, exam)
+        if self.index.find_id(sid) is not None:
+            raise ValueError(f"Student {sid} already exists")
+        self._write(("A", sid, name, c1, c2, c3, exam))
+        row = self._upsert(sid, name, c1, c2, c3, exam)
+        self._maybe_compact()
+        return row
+
+    def edit(self, sid, name, c1, c2, c3, exam):
+        validate_record(sid, name, c1, c2, c3, exam)
+        if self.index.find_id(sid) is None:
+            raise KeyError(sid)
+        self._write(("U", sid, name, c1, c2, c3, exam))
+        row = self._upsert(sid, name, c1, c2, c3, exam)
+        self._maybe_compact()
+        return row
+
+    def delete(self, sid):
+        if self.index.find_id(sid) is None:
+            raise KeyError(sid)
+        self._write(("D", sid))
+        self._delete(sid)
+        self._maybe_compact()
+
+    def compacting(self):
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+        if self._compactor:
+            self._compactor.join()
+
+    # ---------- Internals ----------
+    def _write(self, fields):
+        self._log.write(_encode(fields))
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self.records += 1
+
+    def _maybe_compact(self):
+        # Only once the logged change is in the store: the compaction copies
+        # the store and then deletes the log holding that change
+        if self.records >= COMPACT_AFTER:
+            self._start_compaction()
+
+    def _apply(self, fields):
+        op = fields[0]
+        if op in ("A", "U") and len(fields) == 7:
+            sid, c1, c2, c3, exam = (int(v) for v in (fields[1], *fields[3:]))
+            self._upsert(sid, fields[2], c1, c2, c3, exam)
+        elif op == "D" and len(fields) == 2:
+            self._delete(int(fields[1]))
+
+    def _upsert(self, sid, name, c1, c2, c3, exam):
+        row = self.index.find_id(sid)
+        if row is None:
+            row = self.store.append(sid, name, c1, c2, c3, exam)
+        else:
+            self.index.remove(row)
+            self.store.update(row, sid, name, c1, c2, c3, exam)
+        self.index.add(row)
+        return row
+
+    def _delete(self, sid):
+        row = self.index.find_id(sid)
+        if row is None:
+            return
+        last = len(self.store) - 1
+        self.index.remove(row)
+        if row != last:
+            self.index.remove(last)
+        if self.store.delete(row) is not None:
+            self.index.add(row)
+
+    def _start_compaction(self, rotate=True):
+        if self._compactor and self._compactor.is_alive():
+            return
+        if rotate and self.old_log_path.exists():
+            # The last compaction was skipped: fold the rotated log in first
+            rotate = False
+        if rotate:
+            # New edits go to a fresh log while the old one is folded into the data file
+            self._log.close()
+            os.replace(self.log_path, self.old_log_path)
+            self._log = self.log_path.open("ab")
+            self.records = 0
+        snapshot = self.store.copy()
+        self._compactor = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+        self._compactor.start()
+
+    def _compact(self, snapshot):
+        try:
+            current = _signature(self.data_path.stat())
+        except FileNotFoundError:
+            current = None
+        if current != self._seen:
+            # Written from outside since the store last matched it: replacing
+            # it now would lose that change
+            return
+        self.written = write_students(snapshot, self.data_path)
+        self._seen = _signature(self.written)
+        self.old_log_path.unlink()
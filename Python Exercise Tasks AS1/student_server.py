@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from cohorts import CACHE_BUDGET, CohortCache, LoadedCohort, scan_cohorts
+from grading import DEFAULT_POLICY
+from student_index import StudentIndex
+from student_journal import StudentJournal
+from student_snapshot import read_snapshot
+from student_store import load_students
+
+# ============================
+# Student Manager JSON API
+# ============================
+# Headless server for the same queries as the Student Manager window, so
+# dashboards can poll them without a GUI each:
+#
+#   python student_server.py [--port 8765]
+#
+#   GET /cohorts                      cohort names and header counts
+#   GET /students                     the roster, paged and filtered:
+#         ?offset=0&limit=50          page (limit at most MAX_LIMIT)
+#         &grade=A&min=40&max=70      grade letter, percent range
+#         &name=smi                   name contains (case-insensitive)
+#         &sort=id|name|percent&order=asc|desc   (default: file order)
+#   GET /students/highest             like "Highest Score"
+#   GET /students/lowest              like "Lowest Score"
+#   GET /students/by-name/<name>      like picking a name in the dropdown
+#   GET /students/<id>
+#   GET /stats                        count, mean, grade counts
+#
+# Every endpoint takes ?cohort=<name> (default: the first cohort). Data is
+# loaded read-only: the snapshot or text file plus any logged edits, applied
+# without touching the log. Encoded responses are cached per cohort. The
+# cache is dropped when the data file or its logs change (checked by
+# mtime/size, at most once per CHECK_INTERVAL).
+STUDENT_FILE = Path(__file__).parent / "Assets" / "studentMarks.txt"
+COHORT_DIR = Path(__file__).parent / "Assets" / "cohorts"
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+CHECK_INTERVAL = 1.0
+RESPONSE_CACHE_SIZE = 512
+IDLE_TIMEOUT = 15
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+def _signature(path):
+    # What a change to the data is detected by: the data file and its logs
+    sig = []
+    for p in (path, path.with_name(path.name + ".wal"), path.with_name(path.name + ".wal.1")):
+        try:
+            st = p.stat()
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+def load_cohort(info, policy=DEFAULT_POLICY):
+    # Runs in a worker thread
+    store = read_snapshot(info.path, policy)
+    if store is None:
+        store = load_students(info.path, policy=policy)
+    index = StudentIndex(store)
+    StudentJournal(info.path, store, index).apply_logged()
+    return LoadedCohort(info, store, index, None)
+
+
+def student_json(store, row):
+    return {
+        "id": store.ids[row],
+        "name": store.name(row),
+        "coursework": [store.c1[row], store.c2[row], store.c3[row]],
+        "coursework_total": store.course[row],
+        "exam": store.exam[row],
+        "percent": round(store.percent[row], 2),
+        "grade": store.grade(row),
+    }
+
+
+class StudentServer:
+    def __init__(self, cohorts, policy=DEFAULT_POLICY, budget=CACHE_BUDGET):
+        self.cohorts = {c.name: c for c in cohorts}
+        self.default = cohorts[0].name if cohorts else None
+        self.policy = policy
+        self.loaded = CohortCache(budget)
+        self._signatures = {}       # cohort name -> signature when loaded
+        self._checked = {}          # cohort name -> monotonic time of last check
+        self._responses = OrderedDict()   # (cohort, path, query) -> body bytes
+        self._locks = {}
+
+    # ---------- Data ----------
+    async def cohort(self, name):
+        # The loaded cohort, (re)loading it if it's new or its files changed
+        if name not in self.cohorts:
+            raise HTTPError(404, f"no cohort named {name!r}")
+        info = self.cohorts[name]
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            cached = self.loaded.get(name)
+            if cached is not None and now - self._checked.get(name, 0) < CHECK_INTERVAL:
+                return cached
+            self._checked[name] = now
+            sig = await asyncio.to_thread(_signature, info.path)
+            if cached is not None and sig == self._signatures.get(name):
+                return cached
+            cached = await asyncio.to_thread(load_cohort, info, self.policy)
+            self._signatures[name] = sig
+            self.loaded.put(cached)
+            self._drop_responses(name)
+            return cached
+
+    def _drop_responses(self, name):
+        for key in [k for k in self._responses if k[0] == name]:
+            del self._responses[key]
+
+    # ---------- Requests ----------
+    async def respond(self, target):
+        # Returns (status, body bytes) for a GET of `target`
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        path = url.path.rstrip("/") or "/"
+        if path == "/cohorts":
+            return 200, self._encode({"cohorts": [
+                {"name": c.name, "count": c.count} for c in self.cohorts.values()]})
+        name = query.pop("cohort", self.default)
+        if name is None:
+            raise HTTPError(404, "no cohorts")
+        cohort = await self.cohort(name)
+        key = (name, path, tuple(sorted(query.items())))
+        body = self._responses.get(key)
+        if body is None:
+            body = self._encode(self.route(cohort, path, query))
+            self._responses[key] = body
+            if len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        else:
+            self._responses.move_to_end(key)
+        return 200, body
+
+    @staticmethod
+    def _encode(data):
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def route(self, cohort, path, query):
+        store, index = cohort.store, cohort.index
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        if parts == ["stats"]:
+            return self.stats(store, index)
+        if parts[0] != "students":
+            raise HTTPError(404, f"unknown path {path}")
+        if len(parts) == 1:
+            return self.students(store, index, query)
+        if len(parts) == 2 and parts[1] in ("highest", "lowest"):
+            row = index.highest() if parts[1] == "highest" else index.lowest()
+            return {"student": None if row is None else student_json(store, row)}
+        if len(parts) == 3 and parts[1] == "by-name":
+            return {"students": [student_json(store, r) for r in index.find_name(parts[2])]}
+        if len(parts) == 2:
+            row = index.find_id(_int(parts[1], "student id"))
+            if row is None:
+                raise HTTPError(404, f"no student {parts[1]}")
+            return {"student": student_json(store, row)}
+        raise HTTPError(404, f"unknown path {path}")
+
+    def students(self, store, index, query):
+        offset = max(0, _int(query.get("offset", 0), "offset"))
+        limit = min(MAX_LIMIT, max(0, _int(query.get("limit", DEFAULT_LIMIT), "limit")))
+        sort = query.get("sort")
+        descending = query.get("order", "asc") == "desc"
+        low, high = query.get("min"), query.get("max")
+
+        if sort == "percent" or low is not None or high is not None:
+            # Percent order comes straight from the index (lowest first)
+            rows = index.between(_float(low, "min") if low is not None else float("-inf"),
+                                 _float(high, "max") if high is not None else float("inf"))
+            if sort is None:
+                rows.sort()
+        else:
+            rows = range(len(store))
+        grade = query.get("grade")
+        if grade:
+            code = ord(grade.upper()[:1])
+            rows = [r for r in rows if store.grades[r] == code]
+        needle = query.get("name", "").casefold()
+        if needle:
+            rows = [r for r in rows if needle in store.name(r).casefold()]
+        if sort == "id":
+            rows = sorted(rows, key=store.ids.__getitem__)
+        elif sort == "name":
+            rows = sorted(rows, key=lambda r: store.name(r).casefold())
+        elif sort not in (None, "percent"):
+            raise HTTPError(400, f"cannot sort by {sort!r}")
+        if descending:
+            rows = rows[::-1]
+        page = rows[offset:offset + limit]
+        return {
+            "total": len(rows),
+            "offset": offset,
+            "limit": limit,
+            "students": [student_json(store, r) for r in page],
+        }
+
+    def stats(self, store, index):
+        grades = {}
+        for code in store.grades:
+            grades[chr(code)] = grades.get(chr(code), 0) + 1
+        highest, lowest = index.highest(), index.lowest()
+        return {
+            "count": len(store),
+            "mean_percent": round(sum(store.percent) / len(store), 2) if len(store) else None,
+            "grades": grades,
+            "highest": None if highest is None else student_json(store, highest),
+            "lowest": None if lowest is None else student_json(store, lowest),
+        }
+
+    # ---------- HTTP ----------
+    async def handle(self, reader, writer):
+        # Minimal HTTP/1.1: GET/HEAD only, keep-alive until idle or "close"
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, 400, self._error("malformed request"), True)
+                    break
+                close = (headers.get("connection", "").lower() == "close"
+                         or version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive")
+                if method not in ("GET", "HEAD"):
+                    status, body = 405, self._error("only GET is supported")
+                else:
+                    try:
+                        status, body = await self.respond(target)
+                    except HTTPError as exc:
+                        status, body = exc.status, self._error(str(exc))
+                    except Exception as exc:
+                        status, body = 500, self._error(f"{type(exc).__name__}: {exc}")
+                await self._send(writer, status, body, close, head=method == "HEAD")
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _error(self, message):
+        return self._encode({"error": message})
+
+    @staticmethod
+    async def _send(writer, status, body, close, head=False):
+        head_lines = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                      "Content-Type: application/json; charset=utf-8\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head_lines.encode("latin-1"))
+        if not head:
+            writer.write(body)
+        await writer.drain()
+
+
+async def serve(host, port, cohorts):
+    server = StudentServer(cohorts)
+    listener = await asyncio.start_server(server.handle, host, port)
+    where = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in listener.sockets)
+    print(f"Serving {len(cohorts)} cohort(s) on {where}", flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Student Manager queries as JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to bind (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file", default=str(STUDENT_FILE), help="main data file")
+    parser.add_argument("--cohort-dir", default=str(COHORT_DIR), help="folder of more cohort files")
+    args = parser.parse_args(argv)
+    cohorts = scan_cohorts([args.file], args.cohort_dir)
+    if not cohorts:
+        parser.error(f"{args.file} not found")
+    try:
+        asyncio.run(serve(args.host, args.port, cohorts))
+    except KeyboardInterrupt:
+        pass
+
+
+def _int(value, what):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{what} must be a whole number") from None
+
+
+def _float(value, what):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{what} must be a number") from None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+
+from student_store import StudentStore
+
+# ============================
+# Binary Snapshot
+# ============================
+# A cache of a parsed studentMarks.txt, written next to it as
+# "studentMarks.txt.snap" after a successful text load. If the text file's
+# mtime and size still match on the next launch, the snapshot is memory-mapped
+# and its columns are used in place (zero-copy) instead of re-parsing the CSV.
+#
+# Layout: a fixed header, then one fixed-width section per column (each padded
+# to 8 bytes), then the name table as UTF-8 names separated by "\n".
+MAGIC = b"STUSNAP1"
+VERSION = 1
+# magic, version, byte order, policy fingerprint, source mtime_ns, source size,
+# row count, name count, name table length
+HEADER = struct.Struct("<8sIcxxxIqqQQQ")
+
+# (attribute, array typecode) in file order, widest first to keep alignment
+COLUMNS = (
+    ("percent", "d"),
+    ("ids", "i"),
+    ("name_ref", "I"),
+    ("course", "H"),
+    ("exam", "H"),
+    ("c1", "B"),
+    ("c2", "B"),
+    ("c3", "B"),
+    ("grades", "B"),
+)
+ITEM_SIZES = {"d": 8, "i": 4, "I": 4, "H": 2, "B": 1}
+
+
+def snapshot_path(source):
+    source = Path(source)
+    return source.with_name(source.name + ".snap")
+
+
+def policy_fingerprint(policy):
+    # Percent and grade are stored in the snapshot, so it is only valid for
+    # the grading policy it was written with
+    key = repr((policy.total_max, policy.thresholds, policy.letters)).encode()
+    return zlib.crc32(key)
+
+
+def _byte_order():
+    return b"<" if sys.byteorder == "little" else b">"
+
+
+def _layout(count):
+    # Byte offset of each column section, and where the name table starts
+    offsets = {}
+    pos = HEADER.size
+    for attr, code in COLUMNS:
+        pos = (pos + 7) & ~7
+        offsets[attr] = pos
+        pos += ITEM_SIZES[code] * count
+    return offsets, (pos + 7) & ~7
+
+
+def write_snapshot(store, source, source_stat):
+    # source_stat: os.stat() of the text file taken *before* it was read, so a
+    # change made during loading makes the snapshot look stale, not current
+    path = snapshot_path(source)
+    count = len(store)
+    offsets, names_at = _layout(count)
+    names = "\n".join(store.names).encode("utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, _byte_order(), policy_fingerprint(store.policy),
+                                source_stat.st_mtime_ns, source_stat.st_size,
+                                count, len(store.names), len(names)))
+            for attr, _ in COLUMNS:
+                f.write(b"\0" * (offsets[attr] - f.tell()))
+                f.write(memoryview(getattr(store, attr)).cast("B"))
+            f.write(b"\0" * (names_at - f.tell()))
+            f.write(names)
+        os.replace(tmp, path)
+    except OSError:
+        # No snapshot is fine (e.g. read-only folder, or the old one is mapped on Windows)
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def read_snapshot(source, policy):
+    # Return a StudentStore whose columns are views into the mapped snapshot,
+    # or None if there is no snapshot or it doesn't match the text file
+    path = snapshot_path(source)
+    try:
+        st = Path(source).stat()
+        with path.open("rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mm) < HEADER.size:
+        return None
+    (magic, version, order, fingerprint, mtime_ns, size,
+     count, name_count, names_len) = HEADER.unpack_from(mm, 0)
+    if (magic != MAGIC or version != VERSION or order != _byte_order()
+            or fingerprint != policy_fingerprint(policy)
+            or mtime_ns != st.st_mtime_ns or size != st.st_size):
+        return None
+    offsets, names_at = _layout(count)
+    if len(mm) < names_at + names_len:
+        return None
+
+    view = memoryview(mm)
+    columns = {}
+    for attr, code in COLUMNS:
+        start = offsets[attr]
+        columns[attr] = view[start:start + ITEM_SIZES[code] * count].cast(code)
+    names = bytes(view[names_at:names_at + names_len]).decode("utf-8").split("\n") if name_count else []
+    return StudentStore.from_columns(policy, columns, names)
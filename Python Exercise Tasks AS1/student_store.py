@@ -0,0 +1,322 @@
+import os
+from array import array
+from pathlib import Path
+
+import metrics
+from grading import DEFAULT_POLICY, score_cohort
+
+# ============================
+# Columnar Student Store
+# ============================
+# Holds every student as one slot in a set of typed arrays instead of one dict
+# per row. A million students cost a few tens of MB this way rather than the
+# several hundred MB the old list of dicts needed.
+
+# Read the file in 1 MiB pieces so memory use does not depend on file size.
+CHUNK_SIZE = 1 << 20
+
+# Maximum marks: three coursework components out of 20 and one exam out of 100.
+# Checked on edits (see student_journal.validate_record).
+COURSEWORK_MAX = 20
+EXAM_MAX = 100
+
+# What the columns can hold: ids are signed 32-bit ("i"), coursework marks
+# single bytes ("B") and the exam 16-bit ("H"). A data file row outside these
+# is skipped when loading rather than overflowing its column.
+ID_MIN, ID_MAX = -2 ** 31, 2 ** 31 - 1
+COURSEWORK_LIMIT = 255
+EXAM_LIMIT = 65535
+
+
+def _copy_column(code, col):
+    # Copy any buffer of `code` items into a new array in one memcpy
+    out = array(code)
+    out.frombytes(memoryview(col).cast("B"))
+    return out
+
+
+class StudentStore:
+    def __init__(self, policy=DEFAULT_POLICY):
+        # Grading policy used to fill the percent and grade columns
+        self.policy = policy
+        # One entry per student in each column, all indexed by the same row number.
+        self.ids = array("i")
+        self.c1 = array("B")
+        self.c2 = array("B")
+        self.c3 = array("B")
+        self.course = array("H")
+        self.exam = array("H")
+        self.percent = array("d")
+        self.grades = bytearray()
+        # Names are interned: each distinct name is stored once in `names`
+        # and rows only keep its slot number in `name_ref`.
+        self.name_ref = array("I")
+        self.names = []
+        self._name_slots = {}
+
+    # Column attributes and their array typecodes
+    COLUMNS = (("ids", "i"), ("c1", "B"), ("c2", "B"), ("c3", "B"), ("course", "H"),
+               ("exam", "H"), ("percent", "d"), ("name_ref", "I"))
+
+    @classmethod
+    def from_columns(cls, policy, columns, names):
+        # Build a read-only store over existing buffers (e.g. memoryviews of a
+        # memory-mapped snapshot). Nothing is copied until the first edit.
+        store = cls(policy)
+        for attr, value in columns.items():
+            setattr(store, attr, value)
+        store.names = names
+        store._name_slots = None
+        return store
+
+    def _thaw(self):
+        # Turn borrowed read-only buffers into our own arrays before modifying.
+        # A store built by from_columns() has no name lookup yet, which is how
+        # the mutating methods below know they have to call this first.
+        for attr, code in self.COLUMNS:
+            col = getattr(self, attr)
+            if not isinstance(col, array):
+                setattr(self, attr, _copy_column(code, col))
+        if not isinstance(self.grades, bytearray):
+            self.grades = bytearray(self.grades)
+        if self._name_slots is None:
+            self._name_slots = {}
+            for slot, name in enumerate(self.names):
+                self._name_slots.setdefault(name, slot)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intern_name(self, name):
+        if self._name_slots is None:
+            self._thaw()
+        slot = self._name_slots.get(name)
+        if slot is None:
+            slot = len(self.names)
+            self._name_slots[name] = slot
+            self.names.append(name)
+        return slot
+
+    def append_marks(self, sid, name, c1, c2, c3, exam):
+        # Add the raw marks only; percent and grade are filled in later by
+        # score_rows() so a whole block can be scored in one batch.
+        if self._name_slots is None:
+            self._thaw()
+        self.ids.append(sid)
+        self.name_ref.append(self.intern_name(name))
+        self.c1.append(c1)
+        self.c2.append(c2)
+        self.c3.append(c3)
+        self.course.append(c1 + c2 + c3)
+        self.exam.append(exam)
+        return len(self.ids) - 1
+
+    def append(self, sid, name, c1, c2, c3, exam):
+        # Add and score a single student
+        row = self.append_marks(sid, name, c1, c2, c3, exam)
+        percent = self.policy.percent(self.course[row], exam)
+        self.percent.append(percent)
+        self.grades.append(ord(self.policy.grade(percent)))
+        return row
+
+    def extend(self, other):
+        # Append every row of another store (e.g. a batch parsed on a worker
+        # thread). Scores are copied as-is, names are re-interned into this table.
+        if not len(self) and not self.names:
+            # Nothing here yet: take over the other store's columns without copying
+            for attr, _ in self.COLUMNS:
+                setattr(self, attr, getattr(other, attr))
+            self.grades = other.grades
+            self.names = other.names
+            self._name_slots = other._name_slots
+            return
+        if self._name_slots is None:
+            self._thaw()
+        slots = [self.intern_name(n) for n in other.names]
+        self.name_ref.extend(array("I", [slots[ref] for ref in other.name_ref]))
+        self.ids.extend(other.ids)
+        self.c1.extend(other.c1)
+        self.c2.extend(other.c2)
+        self.c3.extend(other.c3)
+        self.course.extend(other.course)
+        self.exam.extend(other.exam)
+        self.percent.extend(other.percent)
+        self.grades.extend(other.grades)
+
+    def update(self, row, sid, name, c1, c2, c3, exam):
+        # Overwrite one student's record in place and re-score it
+        if self._name_slots is None:
+            self._thaw()
+        self.ids[row] = sid
+        self.name_ref[row] = self.intern_name(name)
+        self.c1[row], self.c2[row], self.c3[row] = c1, c2, c3
+        self.course[row] = c1 + c2 + c3
+        self.exam[row] = exam
+        self.percent[row] = self.policy.percent(self.course[row], exam)
+        self.grades[row] = ord(self.policy.grade(self.percent[row]))
+
+    def delete(self, row):
+        # Constant-time delete: the last row is moved into the gap. Returns the
+        # old row number of the moved student, or None if `row` was the last one.
+        if self._name_slots is None:
+            self._thaw()
+        last = len(self.ids) - 1
+        columns = (self.ids, self.name_ref, self.c1, self.c2, self.c3,
+                   self.course, self.exam, self.percent, self.grades)
+        for col in columns:
+            col[row] = col[last]
+            col.pop()
+        return last if row != last else None
+
+    def copy(self):
+        # Independent copy of the columns (a memcpy per column), e.g. so a
+        # background thread can write a snapshot while edits continue
+        other = StudentStore(self.policy)
+        for attr, code in self.COLUMNS:
+            setattr(other, attr, _copy_column(code, getattr(self, attr)))
+        other.grades = bytearray(self.grades)
+        other.names = list(self.names)
+        other._name_slots = None if self._name_slots is None else dict(self._name_slots)
+        return other
+
+    # ---------- Scoring ----------
+    def score_rows(self, start=0):
+        # (Re)compute percent and grade for every row from `start` onwards
+        if self._name_slots is None:
+            self._thaw()
+        percent, grades = score_cohort(self.course[start:], self.exam[start:], self.policy)
+        self.percent[start:] = percent
+        self.grades[start:] = grades
+
+    def regrade(self, policy):
+        # Apply a new grading policy to the whole cohort without reloading.
+        # A StudentIndex over this store is keyed by percent: go through
+        # StudentIndex.regrade() so its order is rebuilt too.
+        self.policy = policy
+        self.score_rows(0)
+
+    # ---------- Row accessors ----------
+    def name(self, row):
+        return self.names[self.name_ref[row]]
+
+    def grade(self, row):
+        return chr(self.grades[row])
+
+    def row(self, row):
+        # (id, name, coursework, exam, percent, grade) for a single student
+        return (self.ids[row], self.name(row), self.course[row],
+                self.exam[row], self.percent[row], self.grade(row))
+
+    def nbytes(self):
+        # Approximate memory held by the columns (names counted by length only)
+        total = len(self.grades)
+        for col in (self.ids, self.c1, self.c2, self.c3, self.course,
+                    self.exam, self.percent, self.name_ref):
+            total += col.itemsize * len(col)
+        return total + sum(len(n) for n in self.names)
+
+
+# ============================
+# Streaming Loader
+# ============================
+def iter_chunks(path, chunk_size=CHUNK_SIZE, start=0):
+    # Yield blocks of whole lines, chunk_size bytes at a time. A partial line at
+    # the end of a chunk is carried over and glued to the front of the next one.
+    with Path(path).open("rb") as f:
+        f.seek(start)
+        carry = b""
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                carry = data
+                continue
+            carry = data[cut:]
+            yield data[:cut]
+        if carry:
+            yield carry
+
+
+def read_header(path):
+    # A data file starts with a line holding the number of students. Returns
+    # (count, offset of the first student line), or (None, 0) if the file
+    # has no count line. Only the first line is read.
+    with Path(path).open("rb") as f:
+        first = f.readline(32)
+    text = first.strip()
+    if text.isdigit():
+        return int(text), len(first)
+    return None, 0
+
+
+def parse_block(block, store):
+    # Parse a block of "id,name,c1,c2,c3,exam" lines straight into the store.
+    # Lines that don't have six fields, or whose id or marks aren't whole
+    # numbers that fit their columns, are skipped. Ids are stored as numbers,
+    # so "0123" reads as 123. The new rows are then scored in a single batch.
+    start = len(store)
+    append = store.append_marks
+    added = 0
+    for line in block.decode("utf-8").splitlines():
+        parts = line.strip().split(",")
+        if len(parts) != 6:
+            continue
+        try:
+            sid = int(parts[0])
+            c1, c2, c3, exam = map(int, parts[2:6])
+        except ValueError:
+            continue
+        if (not ID_MIN <= sid <= ID_MAX or not 0 <= exam <= EXAM_LIMIT
+                or not (0 <= c1 <= COURSEWORK_LIMIT and 0 <= c2 <= COURSEWORK_LIMIT
+                        and 0 <= c3 <= COURSEWORK_LIMIT)):
+            continue
+        append(sid, parts[1], c1, c2, c3, exam)
+        added += 1
+    store.score_rows(start)
+    return added
+
+
+def iter_student_batches(path, chunk_size=CHUNK_SIZE, policy=DEFAULT_POLICY, start=None):
+    # Parse and score the file one chunk at a time, yielding each chunk as its
+    # own small store along with the file position reached so far. Used by the
+    # background loader so the UI can show partial data while loading continues.
+    # The count line is skipped explicitly rather than failing the row check.
+    # `start` begins at a later line instead (e.g. rows appended since a load).
+    done = read_header(path)[1] if start is None else start
+    for block in iter_chunks(path, chunk_size, done):
+        batch = StudentStore(policy)
+        with metrics.timer("students.parse_chunk", bytes=len(block)) as t:
+            t.set(rows=parse_block(block, batch))
+        done += len(block)
+        yield batch, done
+
+
+def load_students(path, chunk_size=CHUNK_SIZE, policy=DEFAULT_POLICY):
+    store = StudentStore(policy)
+    with metrics.timer("students.load", mode="sync") as t:
+        for block in iter_chunks(path, chunk_size, read_header(path)[1]):
+            parse_block(block, store)
+        t.set(rows=len(store))
+    return store
+
+
+def write_students(store, path):
+    # Write the store in the text format (count line, then one CSV row per
+    # student) via a temporary file, so `path` is replaced atomically and a
+    # crash mid-write leaves the old file untouched. Returns the new file's stat().
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    names = store.names
+    with tmp.open("w", encoding="utf-8", newline="\n") as f:
+        f.write(f"{len(store)}\n")
+        for row in range(len(store)):
+            f.write(f"{store.ids[row]},{names[store.name_ref[row]]},{store.c1[row]},"
+                    f"{store.c2[row]},{store.c3[row]},{store.exam[row]}\n")
+        f.flush()
+        os.fsync(f.fileno())
+        st = os.fstat(f.fileno())
+    os.replace(tmp, path)
+    return st
@@ -0,0 +1,111 @@
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+import pytest
+
+from joke_reactions import BOO, LAUGH, MEH, FenwickSampler, ReactionStore, reaction_weight
+
+
+class FixedDraw:
+    # Stands in for the sampler's rng: random() returns the values given
+    def __init__(self, values):
+        self.values = list(values)
+
+    def random(self):
+        return self.values.pop(0)
+
+
+def assert_prefix_sums(sampler, weights):
+    assert len(sampler) == len(weights)
+    for i, expected in enumerate(accumulate(weights, initial=0.0)):
+        assert sampler._prefix(i) == pytest.approx(expected)
+
+
+def test_tree_matches_brute_force_prefix_sums():
+    rng = random.Random(1)
+    sampler, weights = FenwickSampler(), []
+    for _ in range(300):
+        roll = rng.random()
+        if roll < 0.3:
+            weight = rng.choice([0.1, 1.0, 2.5, 10.0])
+            sampler.append(weight)
+            weights.append(weight)
+        elif roll < 0.5:
+            count = rng.randint(0, 40)
+            # With a block built ahead of time (as the joke app does) or without
+            block = FenwickSampler.uniform_block(len(weights), count) if rng.random() < 0.5 else None
+            sampler.extend_ones(count, block)
+            weights.extend([1.0] * count)
+        elif weights:
+            i = rng.randrange(len(weights))
+            weights[i] = rng.choice([0.1, 1.0, 3.0, 10.0])
+            sampler.update(i, weights[i])
+        assert sampler.total == pytest.approx(sum(weights))
+    assert_prefix_sums(sampler, weights)
+
+
+def test_sample_picks_the_weight_the_draw_falls_in():
+    weights = [1.0, 0.0, 3.0, 0.5, 2.0, 1.5, 1.0]
+    bounds = list(accumulate(weights))
+    draws = [i / 97 for i in range(97)]
+    sampler = FenwickSampler(FixedDraw(draws))
+    for w in weights:
+        sampler.append(w)
+    for draw in list(draws):
+        expected = bisect_right(bounds, draw * bounds[-1])
+        assert sampler.sample() == min(expected, len(weights) - 1)
+
+
+def test_sample_frequencies_follow_the_weights():
+    weights = [1.0, 10.0, 0.1, 1.0, 5.0]
+    sampler = FenwickSampler(random.Random(7))
+    sampler.extend_ones(len(weights))
+    for i, w in enumerate(weights):
+        sampler.update(i, w)
+    draws = 20000
+    counts = [0] * len(weights)
+    for _ in range(draws):
+        counts[sampler.sample()] += 1
+    expected = random.Random(7).choices(range(len(weights)), weights, k=draws)
+    for i in range(len(weights)):
+        assert counts[i] / draws == pytest.approx(expected.count(i) / draws, abs=0.02)
+        assert counts[i] / draws == pytest.approx(weights[i] / sum(weights), abs=0.02)
+
+
+def test_empty_sampler_raises():
+    with pytest.raises(IndexError):
+        FenwickSampler().sample()
+
+
+def test_reactions_are_saved_and_reloaded(tmp_path):
+    path = tmp_path / "reactions.bin"
+    store = ReactionStore(path)
+    store.add(11, LAUGH)
+    store.add(11, LAUGH)
+    store.add(22, BOO)
+    assert store.add(11, MEH) == (2, 1, 0)
+    store.close()
+
+    reopened = ReactionStore(path)
+    assert reopened.get(11) == (2, 1, 0)
+    assert reopened.get(22) == (0, 0, 1)
+    assert reopened.get(33) == (0, 0, 0)
+    assert reopened.weight(11) == reaction_weight(2, 1, 0)
+    assert reopened.weights_for([33, 22, 11], base=5) == [(6, 0.5), (7, 3.0)]
+    reopened.close()
+
+
+def test_torn_record_is_ignored(tmp_path):
+    path = tmp_path / "reactions.bin"
+    store = ReactionStore(path)
+    store.add(11, LAUGH)
+    store.close()
+    with path.open("ab") as f:
+        f.write(b"\x01\x02\x03")  # crashed mid-append
+
+    reopened = ReactionStore(path)
+    assert reopened.counts == {11: [1, 0, 0]}
+    reopened.add(22, BOO)
+    reopened.close()
+    assert ReactionStore(path).counts == {11: [1, 0, 0], 22: [0, 0, 1]}
@@ -0,0 +1,163 @@
+import random
+from bisect import bisect_left, insort
+
+import pytest
+
+import student_index
+from grading import GradingPolicy
+from student_index import IndexPiece, SortedBuckets, StudentIndex
+from student_store import StudentStore
+
+
+@pytest.fixture(autouse=True)
+def small_buckets(monkeypatch):
+    # Small buckets so a few hundred keys already split and drop buckets
+    monkeypatch.setattr(student_index, "BUCKET_SIZE", 4)
+
+
+def make_store(rng, count, first_id=1000):
+    store = StudentStore()
+    for sid in range(first_id, first_id + count):
+        store.append(sid, rng.choice(["Ann", "Bob", "Cy", "Di", "ann"]),
+                     rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20),
+                     rng.randint(0, 100))
+    return store
+
+
+def assert_matches_rebuild(index):
+    fresh = StudentIndex(index.store)
+    assert list(index._order) == list(fresh._order)
+    assert index._by_id == fresh._by_id
+    assert index._by_name == fresh._by_name
+    assert list(index._names) == list(fresh._names)
+    assert len(index) == len(fresh)
+
+
+def test_sorted_buckets_match_a_sorted_list():
+    rng = random.Random(1)
+    buckets, expected = SortedBuckets(), []
+    for _ in range(5000):
+        roll = rng.random()
+        if roll < 0.35:
+            key = rng.randint(0, 300)
+            buckets.add(key)
+            insort(expected, key)
+        elif roll < 0.45:
+            keys = sorted(rng.randint(0, 300) for _ in range(rng.randint(0, 40)))
+            buckets.update(keys)
+            expected = sorted(expected + keys)
+        elif roll < 0.75 and expected:
+            key = rng.choice(expected)
+            buckets.remove(key)
+            expected.remove(key)
+        else:
+            key = rng.randint(-5, 305)
+            assert buckets.rank(key) == bisect_left(expected, key)
+            i = bisect_left(expected, key)
+            assert buckets.ceiling(key) == (expected[i] if i < len(expected) else None)
+            hi = key + rng.randint(0, 50)
+            assert list(buckets.irange(key, hi)) == expected[i:bisect_left(expected, hi)]
+        assert len(buckets) == len(expected)
+    assert list(buckets) == expected
+    assert list(reversed(buckets)) == expected[::-1]
+
+
+def test_remove_missing_key_raises():
+    buckets = SortedBuckets([1, 3, 5])
+    with pytest.raises(KeyError):
+        buckets.remove(4)
+    with pytest.raises(KeyError):
+        buckets.remove(6)
+
+
+def test_merged_pieces_match_a_rebuild():
+    rng = random.Random(2)
+    store = make_store(rng, 30)
+    index = StudentIndex(store)
+    for _ in range(6):
+        batch = make_store(rng, rng.randint(1, 25), first_id=1000 + len(store))
+        piece = IndexPiece(batch, len(store))
+        store.extend(batch)
+        index.merge(piece)
+        # Only part of the percent keys inserted before the next batch
+        index.catch_up(rng.randint(0, 10))
+        assert len(index) == len(store)
+    while index.catch_up(7):
+        pass
+    assert_matches_rebuild(index)
+
+
+def test_order_reads_settle_pending_keys():
+    rng = random.Random(3)
+    store = make_store(rng, 10)
+    index = StudentIndex(store)
+    batch = make_store(rng, 20, first_id=2000)
+    piece = IndexPiece(batch, len(store))
+    store.extend(batch)
+    index.merge(piece)
+    best = max(range(len(store)), key=lambda row: store.percent[row])
+    assert store.percent[index.highest()] == store.percent[best]
+    assert not index.catch_up(1)
+    assert_matches_rebuild(index)
+
+
+def test_edits_and_deletes_keep_the_index_consistent():
+    rng = random.Random(4)
+    store = make_store(rng, 60)
+    index = StudentIndex(store)
+    for _ in range(200):
+        row = rng.randrange(len(store))
+        if rng.random() < 0.5:
+            index.remove(row)
+            store.update(row, store.ids[row], rng.choice(["Ed", "Fay", "Bob"]),
+                         rng.randint(0, 20), rng.randint(0, 20), rng.randint(0, 20),
+                         rng.randint(0, 100))
+            index.add(row)
+        else:
+            # What StudentJournal does: the last row moves into the gap
+            last = len(store) - 1
+            index.remove(row)
+            if row != last:
+                index.remove(last)
+            if store.delete(row) is not None:
+                index.add(row)
+            store.append(9000 + rng.randrange(10 ** 6), "Gus", 1, 2, 3, 4)
+            index.add(len(store) - 1)
+    assert_matches_rebuild(index)
+
+
+def test_regrade_rekeys_the_order():
+    rng = random.Random(5)
+    store = make_store(rng, 80)
+    index = StudentIndex(store)
+    index.regrade(GradingPolicy(total_max=80))
+    assert_matches_rebuild(index)
+    row = index.lowest()
+    index.remove(row)
+    index.add(row)
+    assert_matches_rebuild(index)
+
+
+def test_order_statistics():
+    rng = random.Random(6)
+    store = make_store(rng, 100)
+    index = StudentIndex(store)
+    percents = sorted(store.percent)
+    for probe in (0.0, 12.5, 50.0, percents[40], 100.0):
+        at_or_below = sum(p <= probe for p in percents)
+        assert index.percentile_rank(probe) == pytest.approx(at_or_below / len(percents) * 100)
+    rows = index.between(25.0, 60.0)
+    assert sorted(rows) == [r for r in range(len(store)) if 25.0 <= store.percent[r] <= 60.0]
+    assert [store.percent[r] for r in rows] == sorted(store.percent[r] for r in rows)
+    assert [store.percent[r] for r in index.top(5)] == percents[::-1][:5]
+    assert [store.percent[r] for r in index.bottom(5)] == percents[:5]
+
+
+def test_names_starting_with():
+    store = StudentStore()
+    for sid, name in enumerate(["Ann", "ann", "Anna", "Bob", "Andy"]):
+        store.append(sid, name, 1, 1, 1, 1)
+    index = StudentIndex(store)
+    assert index.names_starting_with("an") == (["Andy", "Ann", "ann", "Anna"], True)
+    assert index.names_starting_with("ann", limit=1) == (["Ann"], False)
+    assert index.names_starting_with("z") == ([], True)
@@ -0,0 +1,132 @@
+import pytest
+
+import student_journal
+from student_index import StudentIndex
+from student_journal import StudentJournal
+from student_store import load_students
+
+ROWS = [
+    (1000, "Ann Lee", 10, 12, 14, 60),
+    (1001, "Bob Ray", 8, 9, 10, 45),
+]
+
+
+def write_data(path, rows=ROWS):
+    lines = [str(len(rows))] + [",".join(str(v) for v in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def open_journal(path):
+    # What the app does on startup: load the data file, then replay the logs
+    store = load_students(path)
+    index = StudentIndex(store)
+    journal = StudentJournal(path, store, index)
+    journal.replay()
+    return journal
+
+
+def students(journal):
+    store = journal.store
+    return {store.ids[row]: store.row(row) for row in range(len(store))}
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    path = tmp_path / "marks.txt"
+    write_data(path)
+    return path
+
+
+def test_compaction_keeps_the_change_that_triggered_it(data_path, monkeypatch):
+    monkeypatch.setattr(student_journal, "COMPACT_AFTER", 3)
+    journal = open_journal(data_path)
+    journal.add(1002, "Cy Dee", 5, 5, 5, 50)
+    journal.edit(1000, "Ann Lee", 20, 20, 20, 100)
+    journal.add(1003, "Di Fox", 7, 7, 7, 70)  # third record: compacts
+    journal.close()
+    assert not journal.old_log_path.exists()
+
+    reopened = open_journal(data_path)
+    assert set(students(reopened)) == {1000, 1001, 1002, 1003}
+    assert students(reopened)[1000][2:4] == (60, 100)
+    # The compacted file has everything without help from the log
+    assert len(load_students(data_path)) == 4
+    reopened.close()
+
+
+def test_replay_after_restart(data_path):
+    journal = open_journal(data_path)
+    journal.add(1002, "Cy Dee", 5, 5, 5, 50)
+    journal.edit(1001, "Bob Ray", 9, 9, 9, 90)
+    journal.delete(1000)
+    expected = students(journal)
+    journal.close()
+
+    reopened = open_journal(data_path)
+    assert students(reopened) == expected
+    assert reopened.records == 3
+    reopened.close()
+
+
+def test_torn_tail_is_dropped_on_replay(data_path):
+    journal = open_journal(data_path)
+    journal.add(1002, "Cy Dee", 5, 5, 5, 50)
+    journal.close()
+    good_size = journal.log_path.stat().st_size
+    with journal.log_path.open("ab") as f:
+        f.write(b"A,1003,Di Fox,7,7")  # crashed mid-write
+
+    reopened = open_journal(data_path)
+    assert set(students(reopened)) == {1000, 1001, 1002}
+    assert journal.log_path.stat().st_size == good_size
+    reopened.add(1003, "Di Fox", 7, 7, 7, 70)
+    reopened.close()
+
+    assert set(students(open_journal(data_path))) == {1000, 1001, 1002, 1003}
+
+
+def test_interrupted_compaction_is_finished_on_restart(data_path):
+    journal = open_journal(data_path)
+    journal.add(1002, "Cy Dee", 5, 5, 5, 50)
+    journal.close()
+    # As if the app stopped after rotating the log but before rewriting the file
+    journal.log_path.replace(journal.old_log_path)
+    reopened = open_journal(data_path)
+    reopened.add(1003, "Di Fox", 7, 7, 7, 70)
+    reopened.close()
+    assert not journal.old_log_path.exists()
+
+    again = open_journal(data_path)
+    assert set(students(again)) == {1000, 1001, 1002, 1003}
+    assert len(load_students(data_path)) == 3  # 1003 is still only in the log
+    again.close()
+
+
+def test_any_id_the_column_holds_is_accepted(data_path):
+    journal = open_journal(data_path)
+    journal.add(12, "Short Id", 1, 1, 1, 1)
+    journal.add(2 ** 31 - 1, "Long Id", 1, 1, 1, 1)
+    journal.edit(12, "Short Id", 2, 2, 2, 2)
+    with pytest.raises(ValueError):
+        journal.add(2 ** 31, "Too Long", 1, 1, 1, 1)
+    journal.close()
+    assert {12, 2 ** 31 - 1} <= set(open_journal(data_path).store.ids)
+
+
+def test_compaction_skips_a_file_changed_from_outside(data_path, monkeypatch):
+    monkeypatch.setattr(student_journal, "COMPACT_AFTER", 2)
+    journal = open_journal(data_path)
+    journal.add(1002, "Cy Dee", 5, 5, 5, 50)
+    # Appended by another program before the app has read it
+    with data_path.open("a", encoding="utf-8") as f:
+        f.write("1003,Di Fox,7,7,7,70\n")
+    journal.add(1004, "Ed Gray", 6, 6, 6, 60)  # second record: compacts
+    journal.close()
+    assert journal.written is None
+    assert journal.old_log_path.exists()
+
+    # Once the app has read the new rows the next compaction goes ahead
+    reopened = open_journal(data_path)
+    reopened.close()
+    assert not journal.old_log_path.exists()
+    assert {1000, 1001, 1002, 1003, 1004} <= set(load_students(data_path).ids)
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from grading import DEFAULT_POLICY, GradingPolicy
+from student_index import StudentIndex
+from student_snapshot import read_snapshot, snapshot_path, write_snapshot
+from student_store import load_students
+
+ROWS = [
+    (1345, "John Curry", 8, 15, 7, 45),
+    (2345, "Sam Sturtivant", 14, 15, 14, 77),
+    (-7, "Zoë Ñúñez", 20, 20, 20, 100),
+    (2 ** 31 - 1, "John Curry", 0, 0, 0, 0),
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "marks.txt"
+    lines = [str(len(ROWS))] + [",".join(str(v) for v in row) for row in ROWS]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def snapshot_of(source, policy=DEFAULT_POLICY):
+    store = load_students(source, policy=policy)
+    write_snapshot(store, source, source.stat())
+    return store
+
+
+def test_round_trip_gives_the_same_rows(source):
+    store = snapshot_of(source)
+    cached = read_snapshot(source, DEFAULT_POLICY)
+    assert cached is not None
+    assert len(cached) == len(store)
+    assert [cached.row(r) for r in range(len(cached))] == [store.row(r) for r in range(len(store))]
+    # The index built from the mapped columns matches one built from the text
+    assert list(StudentIndex(cached)._order) == list(StudentIndex(store)._order)
+
+
+def test_mapped_store_can_be_edited(source):
+    snapshot_of(source)
+    cached = read_snapshot(source, DEFAULT_POLICY)
+    row = cached.append(5000, "New Name", 1, 2, 3, 4)
+    cached.update(0, 1345, "John Curry", 20, 20, 20, 100)
+    assert cached.row(row)[:2] == (5000, "New Name")
+    assert cached.row(0)[2:4] == (60, 100)
+    # The snapshot file itself is untouched
+    again = read_snapshot(source, DEFAULT_POLICY)
+    assert len(again) == len(ROWS)
+    assert again.row(0)[2:4] == (30, 45)
+
+
+def test_empty_store_round_trip(tmp_path):
+    source = tmp_path / "empty.txt"
+    source.write_text("0\n", encoding="utf-8")
+    snapshot_of(source)
+    cached = read_snapshot(source, DEFAULT_POLICY)
+    assert cached is not None and len(cached) == 0
+
+
+def test_changed_source_is_not_read(source):
+    snapshot_of(source)
+    with source.open("a", encoding="utf-8") as f:
+        f.write("9999,Late Entry,1,1,1,1\n")
+    assert read_snapshot(source, DEFAULT_POLICY) is None
+
+
+def test_touched_source_is_not_read(source):
+    snapshot_of(source)
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert read_snapshot(source, DEFAULT_POLICY) is None
+
+
+def test_other_policy_is_not_read(source):
+    snapshot_of(source)
+    assert read_snapshot(source, GradingPolicy(total_max=100)) is None
+
+
+def test_truncated_snapshot_is_not_read(source):
+    snapshot_of(source)
+    path = snapshot_path(source)
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) // 2])
+    assert read_snapshot(source, DEFAULT_POLICY) is None
+    path.write_bytes(b"")
+    assert read_snapshot(source, DEFAULT_POLICY) is None
+
+
+def test_missing_snapshot_is_not_read(source):
+    assert read_snapshot(source, DEFAULT_POLICY) is None
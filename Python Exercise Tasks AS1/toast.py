@@ -0,0 +1,42 @@
+import tkinter as tk
+
+# -----------------------------
+# Toast notifications
+# -----------------------------
+# A small banner placed over the window that hides itself after a moment.
+# Unlike a messagebox it doesn't block the event loop, so timers keep running
+# and the app carries on straight away. A new message replaces the one shown.
+
+STYLES = {
+    "success": ("#4E9F3D", "white"),
+    "info": ("#1E5128", "white"),
+    "warning": ("#E8A317", "#1E1E1E"),
+    "error": ("#C0392B", "white"),
+}
+
+
+class Toast:
+    def __init__(self, window, relx=0.5, rely=0.95, duration_ms=1400, font=("Poppins", 12, "bold")):
+        self.window = window
+        self.relx = relx
+        self.rely = rely
+        self.duration_ms = duration_ms
+        self.label = tk.Label(window, font=font, padx=14, pady=6)
+        self._job = None
+
+    def show(self, message, kind="info", duration_ms=None):
+        bg, fg = STYLES.get(kind, STYLES["info"])
+        self.label.config(text=message, bg=bg, fg=fg)
+        self.label.place(relx=self.relx, rely=self.rely, anchor="center")
+        self.label.lift()
+        self._cancel()
+        self._job = self.window.after(duration_ms or self.duration_ms, self.hide)
+
+    def hide(self):
+        self._cancel()
+        self.label.place_forget()
+
+    def _cancel(self):
+        if self._job is not None:
+            self.window.after_cancel(self._job)
+            self._job = None
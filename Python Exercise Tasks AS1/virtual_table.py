@@ -0,0 +1,103 @@
+# ============================
+# Virtualized Treeview
+# ============================
+# Shows a long list of rows in a ttk.Treeview without inserting one item per
+# row. The tree only ever holds a fixed pool of items, one per visible line;
+# scrolling moves a window over the data and rewrites the pooled items' values,
+# so a repaint costs the same for 10 students or 10 million.
+
+import metrics
+
+
+class VirtualTable:
+    def __init__(self, tree, scrollbar, row_values, height=None):
+        # tree:       the ttk.Treeview to draw into
+        # scrollbar:  a vertical ttk.Scrollbar, driven by this class
+        # row_values: function(row) -> tuple of column values for one row
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.height = height or int(tree.cget("height"))
+        self.rows = range(0)
+        self.offset = 0
+
+        # Item pool, created once and reused for every repaint. Unused items
+        # are detached (hidden) rather than deleted.
+        self._items = [tree.insert("", "end", values=()) for _ in range(self.height)]
+        self._attached = self.height
+        self._set_attached(0)
+
+        scrollbar.configure(command=self.yview)
+        # Mouse wheel (Windows/macOS send <MouseWheel>, X11 sends buttons 4/5)
+        tree.bind("<MouseWheel>", lambda e: self._wheel(-1 if e.delta > 0 else 1))
+        tree.bind("<Button-4>", lambda e: self._wheel(-1))
+        tree.bind("<Button-5>", lambda e: self._wheel(1))
+
+    # ---------- Public API ----------
+    def show(self, rows):
+        # rows: any sequence of row numbers (a range is O(1) to pass in)
+        self.rows = rows
+        self.offset = 0
+        self.refresh()
+
+    def update(self, rows):
+        # Swap in a new row sequence but keep the scroll position (e.g. when
+        # more rows have been loaded into the view being shown)
+        self.rows = rows
+        self.refresh()
+
+    def clear(self):
+        self.show(range(0))
+
+    def refresh(self):
+        # Repaint only the visible window from the data
+        with metrics.timer("table.populate", total=len(self.rows)) as t:
+            self.offset = max(0, min(self.offset, len(self.rows) - self.height))
+            visible = self.rows[self.offset:self.offset + self.height]
+            self._set_attached(len(visible))
+            self.tree.selection_remove(self.tree.selection())
+            for item, row in zip(self._items, visible):
+                self.tree.item(item, values=self.row_values(row))
+            self._update_scrollbar()
+            t.set(rows=len(visible))
+
+    def selected_rows(self):
+        # Row numbers of the selected items (items map to rows via the offset)
+        selected = set(self.tree.selection())
+        return [self.rows[self.offset + k] for k, item in enumerate(self._items[:self._attached])
+                if item in selected]
+
+    def yview(self, *args):
+        # Scrollbar callback: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.height
+            self.offset += step
+        self.refresh()
+
+    # ---------- Internals ----------
+    def _wheel(self, step):
+        self.yview("scroll", step * 3, "units")
+        return "break"
+
+    def _set_attached(self, count):
+        # Show the first `count` pooled items and hide the rest
+        if count == self._attached:
+            return
+        for k in range(count, self._attached):
+            self.tree.detach(self._items[k])
+        for k in range(self._attached, count):
+            self.tree.move(self._items[k], "", k)
+        self._attached = count
+
+    def _update_scrollbar(self):
+        total = len(self.rows)
+        if total <= self.height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + self.height) / total)